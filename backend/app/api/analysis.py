@@ -1,123 +1,150 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import List, Dict
-from datetime import timedelta
-from collections import defaultdict
+import asyncio
 
-from app.db.session import get_session
-from app.models.base import Transaction, RecurringExpense, User
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional, Literal
+from datetime import date, datetime
+
+from app.db.session import get_async_session
+from app.models.base import RecurringExpense, User
 from app.core.security import get_current_user
+from app.core.conditional import conditional
+from app.schemas.analysis import ScanJobRead, MonthlyTotalRead, CashFlowForecast
+from app.services.balances import read_monthly_totals, add_months
+from app.services.cashflow import forecast_cash_flow
+from app.services.jobs import scan_pool, ScanJob
+from app.services.versions import RECURRING, TRANSACTIONS
 
 router = APIRouter()
 
-@router.post("/scan-recurring", response_model=List[RecurringExpense])
-def scan_recurring_expenses(
-    session: Session = Depends(get_session),
+def _job_payload(job: ScanJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "full": job.full,
+        "result": job.result,
+        "error": job.error,
+    }
+
+@router.post(
+    "/scan-recurring",
+    response_model=List[RecurringExpense],
+    responses={202: {"model": ScanJobRead}},
+)
+async def scan_recurring_expenses(
+    full: bool = False, # True = re-escanear todo el historial (backfill)
+    background: bool = False, # True = encolar y devolver el id del job (202)
     current_user: User = Depends(get_current_user)
 ):
     """
-    🧠 CEREBRO DEL DETECTIVE FINANCIERO:
-    1. Busca todas las transacciones del usuario.
-    2. Agrupa por descripción similar.
-    3. Detecta si ocurren mensualmente y con montos parecidos.
-    4. Guarda los hallazgos en la tabla RecurringExpense.
+    Detecta gastos recurrentes nuevos. Es incremental: solo procesa los
+    movimientos posteriores al último escaneo (ver app/services/recurring.py).
+    Siempre corre en el pool de escaneos (fuera del event loop y sin dos
+    escaneos del mismo usuario a la vez). Con `background=true` se devuelve
+    el id del job y el avance se consulta en GET /analysis/jobs/{job_id};
+    si no, se espera a que termine.
     """
-    
-    # 1. Obtener historial (últimos 90 días es un buen rango)
-    # Para simplificar, traemos todas, pero en prod podrías filtrar por fecha.
-    transactions = session.exec(
-        select(Transaction).where(Transaction.user_id == current_user.id)
-    ).all()
+    job = scan_pool.submit(current_user.id, full=full)
+    if background:
+        return JSONResponse(status_code=202, content=_job_payload(job))
 
-    if not transactions:
-        return []
+    # shield: si el cliente se desconecta no cancelamos el job que otros esperan
+    found = await asyncio.shield(asyncio.wrap_future(job.done))
+    # El job guarda el resultado en JSON (para GET /jobs): se revalida al modelo
+    return [RecurringExpense.model_validate(item) for item in found]
 
-    # 2. Agrupamiento Lógico (Normalizamos nombres: "Spotify " -> "spotify")
-    grouped_tx: Dict[str, List[Transaction]] = defaultdict(list)
-    for tx in transactions:
-        clean_name = tx.description.strip().lower()
-        grouped_tx[clean_name].append(tx)
+@router.get("/jobs/{job_id}", response_model=ScanJobRead)
+async def read_scan_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    job = scan_pool.get(job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job no encontrado")
+    return _job_payload(job)
 
-    detected_expenses = []
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
 
-    # 3. Análisis de Patrones
-    for name, tx_list in grouped_tx.items():
-        # Regla A: Debe haber al menos 3 transacciones para considerar "patrón"
-        if len(tx_list) < 3:
-            continue
-            
-        # Ordenamos por fecha para analizar intervalos
-        tx_list.sort(key=lambda x: x.date)
-        
-        # Analizamos intervalos entre fechas
-        is_monthly = True
-        total_amount = 0.0
-        
-        for i in range(1, len(tx_list)):
-            prev_date = tx_list[i-1].date
-            curr_date = tx_list[i].date
-            
-            days_diff = (curr_date - prev_date).days
-            
-            # Regla B: Intervalo mensual (entre 25 y 35 días)
-            if not (25 <= days_diff <= 35):
-                is_monthly = False
-                break
-            
-            total_amount += tx_list[i].amount
+def _parse_month(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m").date()
 
-        # Si cumple patrón mensual, calculamos promedio y guardamos
-        if is_monthly:
-            avg_amount = total_amount / (len(tx_list) - 1) # Promedio simple
-            
-            # Verificar si ya existe este gasto detectado para no duplicar
-            existing = session.exec(
-                select(RecurringExpense)
-                .where(RecurringExpense.user_id == current_user.id)
-                .where(RecurringExpense.name == name)
-            ).first()
+@router.get(
+    "/monthly",
+    response_model=List[MonthlyTotalRead],
+    dependencies=[Depends(conditional(TRANSACTIONS, daily=True))],
+)
+async def read_monthly_totals_endpoint(
+    month_from: Optional[str] = Query(None, pattern=MONTH_PATTERN), # "AAAA-MM"
+    month_to: Optional[str] = Query(None, pattern=MONTH_PATTERN),
+    type: Optional[Literal["income", "expense"]] = None,
+    category: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Totales por mes y categoría (por defecto los últimos 12 meses).
+    Sale del rollup MonthlyCategoryTotal, no recorre Transaction.
+    """
+    end = _parse_month(month_to) if month_to else datetime.utcnow().date().replace(day=1)
+    start = _parse_month(month_from) if month_from else add_months(end, -11)
+    if start > end:
+        raise HTTPException(status_code=400, detail="Rango de meses inválido")
 
-            if not existing:
-                # 💡 ¡EUREKA! Nuevo gasto silencioso encontrado
-                new_recurrence = RecurringExpense(
-                    user_id=current_user.id,
-                    name=name.title(), # Lo ponemos bonito "spotify" -> "Spotify"
-                    amount=round(avg_amount, 2),
-                    frequency="monthly",
-                    detected_day=tx_list[-1].date.day, # Usamos el día del último cobro
-                    confidence_score=0.9, # Estamos 90% seguros
-                    is_confirmed=False # El usuario debe aprobarlo
-                )
-                session.add(new_recurrence)
-                detected_expenses.append(new_recurrence)
+    rows = await session.run_sync(read_monthly_totals, current_user.id, start, end, type, category)
+    return [
+        {
+            "month": row.month.strftime("%Y-%m"),
+            "category": row.category,
+            "type": row.type,
+            "amount": round(row.amount, 2),
+            "tx_count": row.tx_count,
+        }
+        for row in rows
+    ]
 
-    session.commit()
-    
-    # Refrescamos los objetos para devolverlos con ID real
-    for exp in detected_expenses:
-        session.refresh(exp)
-        
-    return detected_expenses
+@router.get(
+    "/forecast",
+    response_model=CashFlowForecast,
+    dependencies=[Depends(conditional(TRANSACTIONS, RECURRING, daily=True))],
+)
+async def read_cash_flow_forecast(
+    days: int = Query(90, ge=1, le=365),
+    low_balance: float = 0.0, # Umbral para la alerta de saldo bajo
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Balance proyectado día a día para los próximos `days` días, con los cobros
+    recurrentes confirmados y la primera fecha en que el saldo baja del umbral.
+    """
+    return await session.run_sync(forecast_cash_flow, current_user.id, days, low_balance)
 
-@router.get("/", response_model=List[RecurringExpense])
-def get_detected_expenses(
-    session: Session = Depends(get_session),
+@router.get(
+    "/",
+    response_model=List[RecurringExpense],
+    dependencies=[Depends(conditional(RECURRING))],
+)
+async def get_detected_expenses(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """Devuelve la lista de gastos recurrentes ya detectados"""
-    return session.exec(
+    return (await session.exec(
         select(RecurringExpense).where(RecurringExpense.user_id == current_user.id)
-    ).all()
+    )).all()
 
 @router.patch("/{expense_id}")
-def respond_to_detected_expense(
+async def respond_to_detected_expense(
     expense_id: int,
     action: str, # Esperamos "confirm" o "ignore"
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     # 1. Buscar el gasto
-    expense = session.get(RecurringExpense, expense_id)
+    expense = await session.get(RecurringExpense, expense_id)
     
     # 2. Seguridad: Verificar que exista y sea de este usuario
     if not expense or expense.user_id != current_user.id:
@@ -133,6 +160,6 @@ def respond_to_detected_expense(
         raise HTTPException(status_code=400, detail="Acción no válida")
         
     session.add(expense)
-    session.commit()
-    session.refresh(expense)
+    await session.commit()
+    await session.refresh(expense)
     return expense
\ No newline at end of file
@@ -1,28 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Any
 
-from app.db.session import get_session
+from app.db.session import get_async_session
 from app.models.base import User
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_and_update_password, create_access_token
 
 router = APIRouter()
 
 @router.post("/login")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(), # FastAPI maneja el formulario standard
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> Any:
     # 1. Buscar usuario por email (form_data.username se usa para el email)
-    user = session.exec(select(User).where(User.email == form_data.username)).first()
+    user = (await session.exec(select(User).where(User.email == form_data.username))).first()
+
+    # Devolvemos la conexión al pool antes de bcrypt: caben más hashes en vuelo
+    # que conexiones, y una ráfaga de logins dejaría sin DB al resto de la API.
+    # close() también desliga `user` sin expirarlo, así que se sigue leyendo.
+    await session.close()
     
-    # 2. Verificar si existe y si la contraseña coincide
-    if not user or not verify_password(form_data.password, user.password_hash):
+    # 2. Verificar si existe y si la contraseña coincide (bcrypt corre en su propio pool)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(form_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=400, 
             detail="Email o contraseña incorrectos"
         )
+
+    # 2.1 Si cambió BCRYPT_ROUNDS, guardamos el hash actualizado
+    if new_hash:
+        session.add(user)
+        user.password_hash = new_hash
+        await session.commit()
     
     # 3. Si todo ok, crear Token
     return {
@@ -1,19 +1,24 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 
-from app.db.session import get_session
+from app.db.session import get_async_session
 from app.models.base import BudgetCategory, User
 from app.schemas.budget import CategoryCreate, CategoryRead
 from app.core.security import get_current_user
+from app.core.conditional import conditional
+from app.services.periods import close_budget_month, period_label
+from app.services.versions import BUDGET
 
 router = APIRouter()
 
 # 1. Crear Categoría
 @router.post("/", response_model=CategoryRead)
-def create_category(
+async def create_category(
     category: CategoryCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     category_data = category.model_dump()
@@ -23,32 +28,40 @@ def create_category(
     db_category.user_id = current_user.id
     
     session.add(db_category)
-    session.commit()
-    session.refresh(db_category)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Índice único (user_id, name): una categoría por nombre y usuario
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Ya tienes una categoría con ese nombre")
+    await session.refresh(db_category)
     
     return db_category
 
 # 2. Leer Categorías
-@router.get("/", response_model=List[CategoryRead])
-def read_categories(
-    session: Session = Depends(get_session),
+@router.get("/", response_model=List[CategoryRead], dependencies=[Depends(conditional(BUDGET))])
+async def read_categories(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    categories = session.exec(
+    categories = (await session.exec(
         select(BudgetCategory).where(BudgetCategory.user_id == current_user.id)
-    ).all()
+    )).all()
     return categories
 
 # 3. Estado del Presupuesto (Alertas)
-@router.get("/status")
-def check_budget_status(
-    session: Session = Depends(get_session),
+@router.get("/status", dependencies=[Depends(conditional(BUDGET))])
+async def check_budget_status(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    categories = session.exec(
+    categories = (await session.exec(
         select(BudgetCategory).where(BudgetCategory.user_id == current_user.id)
-    ).all()
-    
+    )).all()
+    return build_budget_status(categories)
+
+def build_budget_status(categories: List[BudgetCategory]) -> List[dict]:
+    """Alertas por categoría (también las usa el tablero, ver app/api/dashboard.py)."""
     status_report = []
     
     for cat in categories:
@@ -81,36 +94,32 @@ def check_budget_status(
 
 # 4. 🟢 Cierre de Mes (Rollover)
 @router.post("/reset-month")
-def reset_budget_month(
-    session: Session = Depends(get_session),
+async def reset_budget_month(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Cierra el mes: Mueve el sobrante al rollover y reinicia gastos a 0.
+    Un solo UPDATE para todas las categorías; una vez por mes (PeriodClose).
     """
-    categories = session.exec(
-        select(BudgetCategory).where(BudgetCategory.user_id == current_user.id)
-    ).all()
-    
+    period = period_label()
+    categories = (await session.exec(
+        select(BudgetCategory.name, BudgetCategory.spent_amount, BudgetCategory.limit_amount, BudgetCategory.rollover_amount)
+        .where(BudgetCategory.user_id == current_user.id)
+    )).all()
+
+    claimed, _ = await session.run_sync(close_budget_month, [current_user.id], period)
+    if not claimed:
+        return {"message": f"El mes {period} ya estaba cerrado", "details": []}
+    await session.commit()
+
+    # Reporte con los valores previos al cierre (misma fórmula que el UPDATE)
     results = []
-    
-    for cat in categories:
-        total_available = cat.limit_amount + cat.rollover_amount
-        remaining = total_available - cat.spent_amount
-        
-        # Solo hacemos rollover si sobró dinero (no arrastramos deudas negativas)
-        new_rollover = remaining if remaining > 0 else 0.0
-        
+    for name, spent, limit_amount, rollover in categories:
+        remaining = limit_amount + rollover - spent
         results.append({
-            "category": cat.name,
-            "previous_spent": cat.spent_amount,
-            "rolled_over": round(new_rollover, 2)
+            "category": name,
+            "previous_spent": spent,
+            "rolled_over": round(remaining if remaining > 0 else 0.0, 2)
         })
-        
-        # Actualizamos
-        cat.rollover_amount = new_rollover
-        cat.spent_amount = 0.0
-        session.add(cat)
-        
-    session.commit()
-    return {"message": "Mes cerrado exitosamente", "details": results}
\ No newline at end of file
+    return {"message": "Mes cerrado exitosamente", "details": results}
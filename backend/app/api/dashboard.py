@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import get_async_session, async_engine
+from app.models.base import BudgetCategory, Debt, RecurringExpense, SavingGoal, User
+from app.schemas.dashboard import Dashboard
+from app.core.security import get_current_user
+from app.core.conditional import check_not_modified
+from app.api.budget import build_budget_status
+from app.services.balances import build_summary
+from app.services.versions import BUDGET, DEBTS, RECURRING, SAVINGS, TRANSACTIONS
+
+router = APIRouter()
+
+
+def _ratio(part: float, total: float) -> float:
+    return round(min(part / total, 1.0), 4) if total > 0 else 0.0
+
+
+# Cada sección usa su propia sesión: así las consultas corren en paralelo.
+# Devuelven dicts: con response_model_exclude_unset, un objeto del ORM sin
+# campos "asignados" (p. ej. RecurringExpense) saldría como {}.
+async def load_summary(session: AsyncSession, user_id: int) -> dict:
+    today = datetime.utcnow().date()
+    return await session.run_sync(build_summary, user_id, today.replace(day=1), today, "day")
+
+async def load_budget(session: AsyncSession, user_id: int) -> List[dict]:
+    categories = (await session.exec(
+        select(BudgetCategory).where(BudgetCategory.user_id == user_id)
+    )).all()
+    return build_budget_status(categories)
+
+async def load_debts(session: AsyncSession, user_id: int) -> dict:
+    debts = (await session.exec(
+        select(Debt).where(Debt.user_id == user_id).order_by(Debt.id)
+    )).all()
+    total_amount = sum(debt.total_amount for debt in debts)
+    total_balance = sum(debt.current_balance for debt in debts)
+    return {
+        "count": len(debts),
+        "total_amount": round(total_amount, 2),
+        "total_balance": round(total_balance, 2),
+        "total_min_payment": round(sum(debt.min_payment for debt in debts if debt.current_balance > 0), 2),
+        "paid_ratio": _ratio(total_amount - total_balance, total_amount),
+        "debts": [debt.model_dump() for debt in debts],
+    }
+
+async def load_savings(session: AsyncSession, user_id: int) -> dict:
+    goals = (await session.exec(
+        select(SavingGoal).where(SavingGoal.user_id == user_id).order_by(SavingGoal.id)
+    )).all()
+    total_target = sum(goal.target_amount for goal in goals)
+    total_saved = sum(goal.current_amount for goal in goals)
+    return {
+        "total_target": round(total_target, 2),
+        "total_saved": round(total_saved, 2),
+        "progress": _ratio(total_saved, total_target),
+        "goals": [
+            {
+                "id": goal.id,
+                "name": goal.name,
+                "target_amount": goal.target_amount,
+                "current_amount": goal.current_amount,
+                "progress": _ratio(goal.current_amount, goal.target_amount),
+                "deadline": goal.deadline,
+            }
+            for goal in goals
+        ],
+    }
+
+async def load_recurring(session: AsyncSession, user_id: int) -> List[dict]:
+    # Solo las detecciones que el usuario todavía no confirma ni ignora
+    expenses = (await session.exec(
+        select(RecurringExpense)
+        .where(RecurringExpense.user_id == user_id)
+        .where(RecurringExpense.is_confirmed == False) # noqa: E712
+        .where(RecurringExpense.is_ignored == False) # noqa: E712
+        .order_by(RecurringExpense.id)
+    )).all()
+    return [expense.model_dump() for expense in expenses]
+
+
+# Sección -> (cargador, recursos de los que depende para el ETag)
+SECTIONS = {
+    "summary": (load_summary, (TRANSACTIONS,)),
+    "budget": (load_budget, (BUDGET,)),
+    "debts": (load_debts, (DEBTS,)),
+    "savings": (load_savings, (SAVINGS,)),
+    "recurring": (load_recurring, (RECURRING,)),
+}
+
+
+@router.get("/", response_model=Dashboard, response_model_exclude_unset=True)
+async def read_dashboard(
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, description="Secciones separadas por coma: " + ",".join(SECTIONS)),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Tablero en una sola petición: resumen del mes, estado del presupuesto,
+    totales de deudas, avance de metas y gastos recurrentes por confirmar.
+    Un solo JWT/usuario por petición; las secciones independientes se
+    consultan en paralelo. Con `include=` se piden solo algunas.
+    """
+    # 1. Secciones pedidas (todas por defecto)
+    sections = list(SECTIONS)
+    if include:
+        sections = list(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+        unknown = [name for name in sections if name not in SECTIONS]
+        if unknown or not sections:
+            raise HTTPException(status_code=400, detail=f"Secciones no válidas: {', '.join(unknown) or include}")
+
+    # 2. ETag con las versiones de los recursos de esas secciones (304 sin consultar nada)
+    resources = [resource for name in sections for resource in SECTIONS[name][1]]
+    await check_not_modified(request, response, session, current_user.id, resources, daily="summary" in sections)
+
+    # Liberamos la conexión de la sesión de la petición antes de abrir las de las
+    # secciones: si no, cada tablero retiene una y, con muchos a la vez, el pool
+    # se queda sin conexiones para las secciones que esperan.
+    await session.close()
+
+    # 3. Consultas en paralelo, una sesión (conexión) por sección
+    async def run(name: str):
+        loader = SECTIONS[name][0]
+        async with AsyncSession(async_engine, expire_on_commit=False) as section_session:
+            return name, await loader(section_session, current_user.id)
+
+    return dict(await asyncio.gather(*(run(name) for name in sections)))
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 
-from app.db.session import get_session
+from app.db.session import get_async_session
 from app.models.base import Debt, User
-from app.schemas.debt import DebtCreate, DebtRead
+from app.schemas.debt import DebtCreate, DebtRead, DebtSimulationRequest, DebtSimulation
 from app.core.security import get_current_user
+from app.core.conditional import conditional
+from app.core.fast_json import list_columns, list_response
+from app.services.periods import accrue_interest, period_label
+from app.services.payoff import build_simulation
+from app.services.versions import DEBTS
 
 router = APIRouter()
 
 @router.post("/", response_model=DebtRead)
-def create_debt(
+async def create_debt(
     debt: DebtCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     debt_data = debt.model_dump()
@@ -22,51 +28,80 @@ def create_debt(
     db_debt.user_id = current_user.id
     
     session.add(db_debt)
-    session.commit()
-    session.refresh(db_debt)
+    await session.commit()
+    await session.refresh(db_debt)
     return db_debt
 
-@router.get("/", response_model=List[DebtRead])
-def read_debts(
-    session: Session = Depends(get_session),
+@router.get("/", response_model=List[DebtRead], dependencies=[Depends(conditional(DEBTS))])
+async def read_debts(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    debts = session.exec(
-        select(Debt).where(Debt.user_id == current_user.id)
-    ).all()
-    return debts
+    debts = (await session.exec(
+        select(*list_columns(Debt, DebtRead)).where(Debt.user_id == current_user.id)
+    )).all()
+    return list_response(request, response, debts, DebtRead)
+
+# 🧮 Simulador de liquidación (avalanche / snowball / orden propio)
+@router.post("/simulate", response_model=DebtSimulation)
+async def simulate_payoff(
+    params: DebtSimulationRequest,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Proyecta mes a mes la liquidación de todas las deudas con saldo para cada
+    estrategia pedida, con `extra_payment` además de los pagos mínimos.
+    """
+    if "custom" in params.strategies and not params.custom_order:
+        raise HTTPException(status_code=400, detail="La estrategia custom necesita custom_order")
+
+    debts = (await session.exec(
+        select(Debt.id, Debt.name, Debt.current_balance, Debt.interest_rate, Debt.min_payment)
+        .where(Debt.user_id == current_user.id)
+        .where(Debt.current_balance > 0)
+        .order_by(Debt.id)
+    )).all()
+
+    return build_simulation(
+        [tuple(debt) for debt in debts],
+        params.extra_payment,
+        params.strategies,
+        params.custom_order,
+        params.months,
+    )
 
 # 🟢 NUEVO: Simulación de Intereses (Background Job Trigger)
 @router.post("/apply-interests")
-def apply_monthly_interests(
-    session: Session = Depends(get_session),
+async def apply_monthly_interests(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Recorre todas las deudas del usuario y les suma el interés mensual.
-    Fórmula: (Saldo * Tasa Anual / 12) / 100
+    Suma el interés mensual a las deudas del usuario en un solo UPDATE.
+    Fórmula: (Saldo * Tasa Anual / 12) / 100. Una vez por mes (PeriodClose).
     """
-    debts = session.exec(
-        select(Debt).where(Debt.user_id == current_user.id)
-    ).all()
-    
+    period = period_label()
+    debts = (await session.exec(
+        select(Debt.name, Debt.current_balance, Debt.interest_rate)
+        .where(Debt.user_id == current_user.id)
+        .where(Debt.current_balance > 0)
+        .where(Debt.interest_rate > 0)
+    )).all()
+
+    claimed, _ = await session.run_sync(accrue_interest, [current_user.id], period)
+    if not claimed:
+        return {"message": f"Los intereses de {period} ya estaban aplicados", "details": []}
+    await session.commit()
+
     results = []
-    
-    for debt in debts:
-        if debt.current_balance > 0 and debt.interest_rate > 0:
-            # Calculamos interés mensual
-            monthly_rate = debt.interest_rate / 12
-            interest_amount = debt.current_balance * (monthly_rate / 100)
-            
-            # Actualizamos deuda
-            debt.current_balance += interest_amount
-            session.add(debt)
-            
-            results.append({
-                "debt": debt.name,
-                "added_interest": round(interest_amount, 2),
-                "new_balance": round(debt.current_balance, 2)
-            })
-            
-    session.commit()
-    return {"message": "Intereses aplicados exitosamente", "details": results}
\ No newline at end of file
+    for name, balance, rate in debts:
+        interest_amount = balance * (rate / 12 / 100)
+        results.append({
+            "debt": name,
+            "added_interest": round(interest_amount, 2),
+            "new_balance": round(balance + interest_amount, 2)
+        })
+    return {"message": "Intereses aplicados exitosamente", "details": results}
@@ -1,19 +1,24 @@
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 
-from app.db.session import get_session
+from app.db.session import get_async_session
 from app.models.base import SavingGoal, User
-from app.schemas.saving import SavingCreate, SavingRead
+from app.schemas.saving import SavingCreate, SavingRead, GoalForecast
 from app.core.security import get_current_user
+from app.core.conditional import conditional
+from app.core.fast_json import list_columns, list_response
+from app.services.goals import forecast_goals
+from app.services.versions import SAVINGS
 
 router = APIRouter()
 
 # 1. Crear Meta de Ahorro (Protegido)
 @router.post("/", response_model=SavingRead)
-def create_saving_goal(
+async def create_saving_goal(
     saving: SavingCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user) # 🔒
 ):
     saving_data = saving.model_dump()
@@ -23,18 +28,36 @@ def create_saving_goal(
     db_saving.user_id = current_user.id
     
     session.add(db_saving)
-    session.commit()
-    session.refresh(db_saving)
+    await session.commit()
+    await session.refresh(db_saving)
     return db_saving
 
 # 2. Leer Metas (Filtrado)
-@router.get("/", response_model=List[SavingRead])
-def read_saving_goals(
-    session: Session = Depends(get_session),
+@router.get("/", response_model=List[SavingRead], dependencies=[Depends(conditional(SAVINGS))])
+async def read_saving_goals(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user) # 🔒
 ):
     # 🔒 Filtrar por usuario
-    goals = session.exec(
-        select(SavingGoal).where(SavingGoal.user_id == current_user.id)
-    ).all()
-    return goals
\ No newline at end of file
+    goals = (await session.exec(
+        select(*list_columns(SavingGoal, SavingRead)).where(SavingGoal.user_id == current_user.id)
+    )).all()
+    return list_response(request, response, goals, SavingRead)
+
+# 3. 🎯 Pronóstico de Metas (¿llego a tiempo?)
+@router.get(
+    "/forecast",
+    response_model=List[GoalForecast],
+    dependencies=[Depends(conditional(SAVINGS, daily=True))],
+)
+async def forecast_saving_goals(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user) # 🔒
+):
+    """
+    Para cada meta: ritmo de aportes reciente, fecha estimada de cumplimiento,
+    si va a tiempo y cuánto hace falta por mes para llegar a la fecha límite.
+    """
+    return await session.run_sync(forecast_goals, current_user.id)
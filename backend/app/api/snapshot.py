@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from typing import Literal
+import tempfile
+
+from app.db.session import run_in_session
+from app.models.base import User
+from app.core.security import get_current_user
+from app.services.columnar import write_source
+
+router = APIRouter()
+
+READ_CHUNK = 64 * 1024
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+@router.get("/{source}")
+async def download_snapshot(
+    source: Literal["transactions", "debts", "savings", "budgets"],
+    format: Literal["parquet", "arrow"] = "parquet",
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Snapshot columnar de una tabla del usuario (Parquet o Arrow IPC stream)
+    para análisis offline. Se escribe por lotes a un archivo temporal (en
+    memoria hasta SPOOL_MAX_BYTES, luego a disco) y se transmite desde ahí.
+    """
+    sink = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    await run_in_session(write_source, source, current_user.id, sink, format)
+    sink.seek(0)
+
+    def read_file():
+        with sink:
+            while chunk := sink.read(READ_CHUNK):
+                yield chunk
+
+    extension = "parquet" if format == "parquet" else "arrows"
+    media_type = "application/vnd.apache.parquet" if format == "parquet" else "application/vnd.apache.arrow.stream"
+    return StreamingResponse(
+        read_file(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{source}.{extension}"'},
+    )
@@ -1,19 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import List
-
-from app.db.session import get_session
-# Importamos SavingGoal además de las otras tablas
-from app.models.base import Transaction, User, BudgetCategory, Debt, SavingGoal
-from app.schemas.transaction import TransactionCreate, TransactionRead
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session, select, col, or_, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional, Literal
+from collections import defaultdict
+from datetime import datetime, date
+import base64
+import csv
+import io
+import json
+import zlib
+
+from app.db.session import get_async_session, async_engine, run_in_session
+from app.models.base import Transaction, User
+from app.schemas.transaction import (
+    TransactionCreate, TransactionRead, BalanceSummary, BulkResult
+)
 from app.core.security import get_current_user
+from app.core.conditional import conditional
+from app.core.fast_json import list_columns, list_response
+from app.services.balances import record_transactions, build_summary
+from app.services.ledger import load_targets, apply_adjustments, adjust_for_transaction
+from app.services.versions import TRANSACTIONS, mark_changed, transaction_resources
 
 router = APIRouter()
 
+BULK_MAX_ROWS = 50_000
+BULK_INSERT_BATCH = 1_000
+EXPORT_BATCH = 1_000
+EXPORT_COLUMNS = ("id", "date", "type", "category", "description", "amount", "debt_id", "saving_goal_id")
+
 @router.post("/", response_model=TransactionRead)
-def create_transaction(
+async def create_transaction(
     transaction: TransactionCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     transaction_data = transaction.model_dump()
@@ -22,48 +44,306 @@ def create_transaction(
     
     db_transaction = Transaction(**transaction_data)
     db_transaction.user_id = current_user.id 
+    # Sin fecha en el body = ahora (igual que la carga masiva); los acumulados la necesitan
+    db_transaction.date = db_transaction.date or datetime.utcnow()
     session.add(db_transaction)
     
-    # 1. LÓGICA DE PRESUPUESTO (Gasto normal)
-    # Solo afectamos el presupuesto si es un gasto y tiene categoría
-    if db_transaction.type == "expense" and db_transaction.category:
-        category = session.exec(
-            select(BudgetCategory)
-            .where(BudgetCategory.user_id == current_user.id)
-            .where(BudgetCategory.name == db_transaction.category)
-        ).first()
-        if category:
-            category.spent_amount += db_transaction.amount
-            session.add(category)
-
-    # 2. LÓGICA DE DEUDAS (Abono a Capital)
-    if db_transaction.debt_id:
-        debt = session.get(Debt, db_transaction.debt_id)
-        if debt and debt.user_id == current_user.id:
-            debt.current_balance -= db_transaction.amount
-            if debt.current_balance < 0:
-                debt.current_balance = 0
-            session.add(debt)
-
-    # 3. 🟢 LÓGICA DE METAS DE AHORRO (Asignación de Fondos)
-    if db_transaction.saving_goal_id:
-        goal = session.get(SavingGoal, db_transaction.saving_goal_id)
-        # Verificamos que la meta exista y pertenezca al usuario
-        if goal and goal.user_id == current_user.id:
-            goal.current_amount += db_transaction.amount
-            # Opcional: Podrías validar aquí si goal.current_amount > goal.target_amount
-            session.add(goal)
-    
-    session.commit()
-    session.refresh(db_transaction)
+    # 1-3. Presupuesto (gasto normal), abono a deuda y aporte a meta de ahorro.
+    # UPDATEs atómicos (col = col + monto) en vez de leer-modificar-escribir:
+    # las altas concurrentes sobre la misma fila ya no pierden actualizaciones.
+    await session.run_sync(
+        adjust_for_transaction, current_user.id,
+        db_transaction.type, db_transaction.amount, db_transaction.category,
+        db_transaction.debt_id, db_transaction.saving_goal_id,
+    )
+
+    # 4. 📊 Totales acumulados del resumen (mismo commit)
+    await session.run_sync(
+        record_transactions, current_user.id,
+        [(db_transaction.type, db_transaction.amount, db_transaction.date, db_transaction.category)],
+    )
+
+    await session.commit()
+    await session.refresh(db_transaction)
     return db_transaction
 
-@router.get("/", response_model=List[TransactionRead])
-def read_transactions(
-    session: Session = Depends(get_session),
+async def read_bulk_rows(request: Request) -> list:
+    """Lee el cuerpo como arreglo JSON o como NDJSON (un objeto por línea)."""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            rows = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            rows = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cuerpo JSON/NDJSON inválido")
+
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Se esperaba una lista de transacciones")
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Máximo {BULK_MAX_ROWS} transacciones por lote")
+    return rows
+
+@router.post("/bulk", response_model=BulkResult)
+async def create_transactions_bulk(
+    rows: list = Depends(read_bulk_rows),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Carga masiva: inserta en lotes, aplica presupuesto/deudas/metas con
+    UPDATEs agrupados y hace un solo commit. Las filas inválidas se reportan
+    sin abortar el resto.
+    """
+    return await run_in_session(ingest_rows, current_user.id, rows)
+
+def ingest_rows(session: Session, user_id: int, rows: list) -> dict:
+    """Parte síncrona de la carga masiva (corre en el threadpool, ver `run_in_session`)."""
+    categories, debt_ids, goal_ids = load_targets(session, user_id)
+
+    errors = []
+    values = []
+    category_deltas = defaultdict(float)
+    debt_deltas = defaultdict(float)
+    goal_deltas = defaultdict(float)
+    now = datetime.utcnow()
+
+    # 1. Validación fila por fila (sin tocar la DB)
+    for index, raw in enumerate(rows):
+        try:
+            tx = TransactionCreate.model_validate(raw)
+        except ValidationError as exc:
+            first = exc.errors()[0]
+            field = ".".join(str(part) for part in first["loc"])
+            errors.append({"index": index, "error": f"{field}: {first['msg']}"})
+            continue
+
+        if tx.debt_id is not None and tx.debt_id not in debt_ids:
+            errors.append({"index": index, "error": "Deuda no encontrada"})
+            continue
+        if tx.saving_goal_id is not None and tx.saving_goal_id not in goal_ids:
+            errors.append({"index": index, "error": "Meta de ahorro no encontrada"})
+            continue
+
+        row = tx.model_dump()
+        row["user_id"] = user_id
+        row["date"] = row["date"] or now
+        values.append(row)
+
+        # 2. Ajustes agrupados por fila destino (misma lógica que el alta individual)
+        if tx.type == "expense" and tx.category in categories:
+            category_deltas[categories[tx.category]] += tx.amount
+        if tx.debt_id:
+            debt_deltas[tx.debt_id] += tx.amount
+        if tx.saving_goal_id:
+            goal_deltas[tx.saving_goal_id] += tx.amount
+
+    # 3. Inserción por lotes + UPDATEs set-based + totales, todo en un commit
+    for start in range(0, len(values), BULK_INSERT_BATCH):
+        session.execute(insert(Transaction), values[start:start + BULK_INSERT_BATCH])
+
+    apply_adjustments(session, category_deltas, debt_deltas, goal_deltas)
+    if values:
+        mark_changed(session, [user_id], *set().union(*(
+            transaction_resources(row["type"], row["debt_id"], row["saving_goal_id"]) for row in values
+        )))
+    record_transactions(
+        session, user_id,
+        [(row["type"], row["amount"], row["date"], row["category"]) for row in values],
+    )
+    session.commit()
+
+    return {"inserted": len(values), "errors": errors}
+
+@router.get(
+    "/summary",
+    response_model=BalanceSummary,
+    dependencies=[Depends(conditional(TRANSACTIONS, daily=True))],
+)
+async def read_summary(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    granularity: Literal["day", "month"] = "day",
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    transactions = session.exec(
-        select(Transaction).where(Transaction.user_id == current_user.id)
-    ).all()
-    return transactions
\ No newline at end of file
+    """
+    Balance total + ingresos/gastos del periodo (por defecto el mes en curso)
+    y su serie diaria o mensual. Lee los acumulados, no el historial.
+    """
+    today = datetime.utcnow().date()
+    date_to = date_to or today
+    date_from = date_from or date_to.replace(day=1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="Rango de fechas inválido")
+
+    return await session.run_sync(build_summary, current_user.id, date_from, date_to, granularity)
+
+class TransactionFilters:
+    """Filtros comunes del historial (listado, exportación, etc.)."""
+
+    def __init__(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        type: Optional[str] = None,
+        category: Optional[str] = None,
+        debt_id: Optional[int] = None,
+        saving_goal_id: Optional[int] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+    ):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.type = type
+        self.category = category
+        self.debt_id = debt_id
+        self.saving_goal_id = saving_goal_id
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+
+    def apply(self, statement):
+        if self.date_from is not None:
+            statement = statement.where(Transaction.date >= self.date_from)
+        if self.date_to is not None:
+            statement = statement.where(Transaction.date <= self.date_to)
+        if self.type:
+            statement = statement.where(Transaction.type == self.type)
+        if self.category:
+            statement = statement.where(Transaction.category == self.category)
+        if self.debt_id is not None:
+            statement = statement.where(Transaction.debt_id == self.debt_id)
+        if self.saving_goal_id is not None:
+            statement = statement.where(Transaction.saving_goal_id == self.saving_goal_id)
+        if self.min_amount is not None:
+            statement = statement.where(Transaction.amount >= self.min_amount)
+        if self.max_amount is not None:
+            statement = statement.where(Transaction.amount <= self.max_amount)
+        return statement
+
+
+# 🔖 Cursor opaco: "fecha|id" en base64 (keyset sobre (date, id))
+def encode_cursor(tx_date: datetime, tx_id: int) -> str:
+    raw = f"{tx_date.isoformat()}|{tx_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_date, raw_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(raw_date), int(raw_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+@router.get(
+    "/",
+    response_model=List[TransactionRead],
+    dependencies=[Depends(conditional(TRANSACTIONS))],
+)
+async def read_transactions(
+    request: Request,
+    response: Response,
+    filters: TransactionFilters = Depends(),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    include_all: bool = Query(default=False, alias="all"), # Opt-in: historial completo sin paginar
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Historial paginado por keyset sobre (date, id), del más nuevo al más viejo.
+    El cursor de la siguiente página viaja en el header `X-Next-Cursor`.
+    Selecciona solo las columnas de TransactionRead (ver app/core/fast_json.py).
+    """
+    statement = filters.apply(
+        select(*list_columns(Transaction, TransactionRead)).where(Transaction.user_id == current_user.id)
+    )
+
+    # Modo legado: todo el historial, tal como antes
+    if include_all:
+        return list_response(request, response, (await session.exec(statement)).all(), TransactionRead)
+
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                Transaction.date < cursor_date,
+                and_(Transaction.date == cursor_date, col(Transaction.id) < cursor_id),
+            )
+        )
+
+    # Pedimos una fila extra para saber si hay otra página
+    transactions = (await session.exec(
+        statement
+        .order_by(col(Transaction.date).desc(), col(Transaction.id).desc())
+        .limit(limit + 1)
+    )).all()
+
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.date, last.id)
+
+    return list_response(request, response, transactions, TransactionRead)
+
+
+def _export_lines(rows, export_format: str, with_header: bool) -> str:
+    """Serializa un lote de filas (tuplas en el orden de EXPORT_COLUMNS)."""
+    if export_format == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=lambda value: value.isoformat(), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if with_header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+@router.get("/export")
+async def export_transactions(
+    request: Request,
+    filters: TransactionFilters = Depends(),
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Descarga del historial completo (del más viejo al más nuevo) como CSV o
+    NDJSON. Se transmite por lotes de EXPORT_BATCH filas leídas de un cursor
+    del servidor, así la memoria no crece con el tamaño del historial.
+    Si el cliente acepta gzip se comprime al vuelo.
+    """
+    statement = filters.apply(
+        select(*[getattr(Transaction, name) for name in EXPORT_COLUMNS])
+        .where(Transaction.user_id == current_user.id)
+    ).order_by(Transaction.date, Transaction.id)
+
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+
+    async def generate():
+        # Sesión propia: la del Depends se cierra antes de que termine el streaming
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+        first = True
+        async with AsyncSession(async_engine) as session:
+            result = await session.stream(statement.execution_options(yield_per=EXPORT_BATCH))
+            async for batch in result.partitions(EXPORT_BATCH):
+                chunk = _export_lines(batch, format, with_header=first).encode()
+                first = False
+                yield compressor.compress(chunk) if compressor else chunk
+        if first and format == "csv":
+            # Historial vacío: al menos el encabezado
+            chunk = _export_lines([], format, with_header=True).encode()
+            yield compressor.compress(chunk) if compressor else chunk
+        if compressor:
+            yield compressor.flush()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="movimientos.{format}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(generate(), media_type=media_type, headers=headers)
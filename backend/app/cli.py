@@ -0,0 +1,279 @@
+"""
+Comandos de mantenimiento (ejecutar desde backend/):
+
+    python -m app.cli rebuild-summary [--user-id N] [--check]
+    python -m app.cli rebuild-monthly [--user-id N]
+    python -m app.cli scan-all [--workers 4] [--chunk 500] [--full]
+    python -m app.cli reconcile [--user-id N] [--since AAAA-MM-DD] [--check]
+    python -m app.cli close-period [--period AAAA-MM] [--chunk 500] [--only budget|interest]
+    python -m app.cli create-indexes
+    python -m app.cli snapshot --user-id N [--out snapshots/] [--format parquet|arrow]
+    python -m app.cli explain-check [--verbose]
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, select, col
+
+from app.db.query_plans import check_plans
+from app.db.session import engine
+from app.models.base import User
+from app.services.balances import rebuild_balances, rebuild_monthly_totals
+from app.services.columnar import write_snapshot
+from app.services.jobs import scan_user
+from app.services.ledger import reconcile_budgets
+from app.services.periods import (
+    BUDGET_CLOSE, INTEREST_ACCRUAL, accrue_interest, close_budget_month, period_label
+)
+
+
+def cmd_rebuild_summary(args) -> int:
+    with Session(engine) as session:
+        drift = rebuild_balances(session, user_id=args.user_id, dry_run=args.check)
+
+    for item in drift:
+        print(
+            f"⚠️  Usuario {item['user_id']}: balance guardado {item['stored_balance']} "
+            f"vs real {item['expected_balance']} "
+            f"({item['stored_count']} / {item['expected_count']} movimientos)"
+        )
+    if args.check:
+        print(f"🔎 {len(drift)} usuario(s) con deriva")
+        return 1 if drift else 0
+
+    print(f"✅ Acumulados recalculados ({len(drift)} usuario(s) corregidos)")
+    return 0
+
+
+def cmd_rebuild_monthly(args) -> int:
+    started = time.perf_counter()
+    with Session(engine) as session:
+        rows = rebuild_monthly_totals(session, user_id=args.user_id)
+    print(f"✅ Totales mensuales por categoría recalculados: {rows} filas ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+def cmd_reconcile(args) -> int:
+    """Contadores de presupuesto + acumulados del resumen contra Transaction."""
+    with Session(engine) as session:
+        budget_drift = reconcile_budgets(session, args.since, user_id=args.user_id, dry_run=args.check)
+        balance_drift = rebuild_balances(session, user_id=args.user_id, dry_run=args.check)
+
+    for item in budget_drift:
+        start = item["period_start"]
+        print(
+            f"⚠️  Usuario {item['user_id']} / {item['name']}: gastado {item['stored_spent']} "
+            f"vs real {item['expected_spent']} (desde {f'{start:%Y-%m-%d %H:%M}' if start else 'el inicio'})"
+        )
+    for item in balance_drift:
+        print(
+            f"⚠️  Usuario {item['user_id']}: balance guardado {item['stored_balance']} "
+            f"vs real {item['expected_balance']}"
+        )
+
+    total = len(budget_drift) + len(balance_drift)
+    if args.check:
+        print(f"🔎 {len(budget_drift)} categoría(s) y {len(balance_drift)} usuario(s) con deriva")
+        return 1 if total else 0
+
+    print(f"✅ Contadores reconciliados ({total} corregidos)")
+    return 0
+
+
+def iter_user_chunks(chunk_size: int):
+    """Ids de usuario por bloques (keyset sobre User.id)."""
+    last_id = 0
+    while True:
+        with Session(engine) as session:
+            ids = session.exec(
+                select(User.id).where(col(User.id) > last_id).order_by(User.id).limit(chunk_size)
+            ).all()
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def cmd_scan_all(args) -> int:
+    started = time.perf_counter()
+    scanned = detected = failed = 0
+
+    def scan(user_id: int):
+        try:
+            return len(scan_user(user_id, full=args.full))
+        except Exception as exc:
+            print(f"❌ Usuario {user_id}: {exc}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="scan") as pool:
+        for ids in iter_user_chunks(args.chunk):
+            for found in pool.map(scan, ids):
+                if found is None:
+                    failed += 1
+                else:
+                    detected += found
+            scanned += len(ids)
+            print(f"🔄 {scanned} usuarios escaneados, {detected} gastos nuevos ({time.perf_counter() - started:.1f}s)")
+
+    print(f"✅ Escaneo nocturno terminado: {scanned} usuarios, {detected} detecciones, {failed} errores")
+    return 1 if failed else 0
+
+
+def cmd_close_period(args) -> int:
+    """Cierre de mes + intereses de todos los usuarios, un commit por bloque."""
+    period = args.period or period_label()
+    steps = [
+        (kind, operation) for kind, operation in (
+            (BUDGET_CLOSE, close_budget_month),
+            (INTEREST_ACCRUAL, accrue_interest),
+        )
+        if args.only in (None, kind)
+    ]
+    started = time.perf_counter()
+    seen = failed = 0
+    closed = {kind: 0 for kind, _ in steps}
+    rows = {kind: 0 for kind, _ in steps}
+
+    for ids in iter_user_chunks(args.chunk):
+        with Session(engine) as session:
+            try:
+                for kind, operation in steps:
+                    claimed, updated = operation(session, ids, period)
+                    closed[kind] += len(claimed)
+                    rows[kind] += updated
+                session.commit()
+            except IntegrityError:
+                # Otro proceso cerró este bloque a la vez: se revierte entero
+                session.rollback()
+                failed += len(ids)
+                print(f"❌ Bloque {ids[0]}-{ids[-1]} cerrado en paralelo por otro proceso, se omite")
+        seen += len(ids)
+        print(
+            f"🔄 {period}: {seen} usuarios revisados, "
+            + ", ".join(f"{kind} {closed[kind]} ({rows[kind]} filas)" for kind, _ in steps)
+            + f" ({time.perf_counter() - started:.1f}s)"
+        )
+
+    print(f"✅ Cierre {period} terminado: {seen} usuarios, {failed} omitidos")
+    return 1 if failed else 0
+
+
+def cmd_create_indexes(args) -> int:
+    """Crea en tablas existentes los índices que create_all no agrega."""
+    failed = 0
+    for table in SQLModel.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda item: item.name):
+            try:
+                index.create(engine, checkfirst=True)
+                print(f"✅ {table.name}.{index.name}")
+            except IntegrityError:
+                # Índice único con duplicados previos: hay que limpiarlos a mano
+                failed += 1
+                print(f"❌ {table.name}.{index.name}: hay filas duplicadas para {[c.name for c in index.columns]}")
+    return 1 if failed else 0
+
+
+def cmd_explain_check(args) -> int:
+    """Falla si alguna consulta caliente cae en un recorrido completo de tabla."""
+    regressions = 0
+    for result in check_plans(engine):
+        if result["problems"]:
+            regressions += 1
+            print(f"❌ {result['name']}: {'; '.join(result['problems'])}")
+        else:
+            print(f"✅ {result['name']}")
+        if args.verbose or result["problems"]:
+            for line in result["plan"]:
+                print(f"     {line}")
+    print(f"🔎 {regressions} consulta(s) con recorrido completo ({engine.dialect.name})")
+    return 1 if regressions else 0
+
+
+def cmd_snapshot(args) -> int:
+    started = time.perf_counter()
+    directory = f"{args.out.rstrip('/')}/user_{args.user_id}"
+    with Session(engine) as session:
+        rows = write_snapshot(session, args.user_id, directory, args.format)
+    for name, count in rows.items():
+        print(f"📦 {name}: {count} filas")
+    print(f"✅ Snapshot en {directory} ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-summary", help="Recalcula los totales del resumen desde Transaction"
+    )
+    rebuild.add_argument("--user-id", type=int, default=None)
+    rebuild.add_argument("--check", action="store_true", help="Solo reporta la deriva, no escribe")
+    rebuild.set_defaults(handler=cmd_rebuild_summary)
+
+    rebuild_monthly = commands.add_parser(
+        "rebuild-monthly", help="Backfill de los totales mensuales por categoría desde Transaction"
+    )
+    rebuild_monthly.add_argument("--user-id", type=int, default=None)
+    rebuild_monthly.set_defaults(handler=cmd_rebuild_monthly)
+
+    scan_all = commands.add_parser(
+        "scan-all", help="Escanea gastos recurrentes de todos los usuarios (job nocturno)"
+    )
+    scan_all.add_argument("--workers", type=int, default=4)
+    scan_all.add_argument("--chunk", type=int, default=500)
+    scan_all.add_argument("--full", action="store_true", help="Re-escanea todo el historial")
+    scan_all.set_defaults(handler=cmd_scan_all)
+
+    reconcile = commands.add_parser(
+        "reconcile", help="Recalcula los contadores de presupuesto y del resumen y reporta la deriva"
+    )
+    reconcile.add_argument("--user-id", type=int, default=None)
+    reconcile.add_argument(
+        "--since", type=date.fromisoformat, default=None,
+        help="Fuerza el inicio del periodo del presupuesto (por defecto, el último cierre de mes de cada usuario)",
+    )
+    reconcile.add_argument("--check", action="store_true", help="Solo reporta la deriva, no escribe")
+    reconcile.set_defaults(handler=cmd_reconcile)
+
+    close_period = commands.add_parser(
+        "close-period", help="Cierra el mes del presupuesto y aplica intereses a todos los usuarios"
+    )
+    close_period.add_argument(
+        "--period", type=lambda value: datetime.strptime(value, "%Y-%m").strftime("%Y-%m"),
+        default=None, help="AAAA-MM (por defecto el mes en curso)",
+    )
+    close_period.add_argument("--chunk", type=int, default=500)
+    close_period.add_argument("--only", choices=[BUDGET_CLOSE, INTEREST_ACCRUAL], default=None)
+    close_period.set_defaults(handler=cmd_close_period)
+
+    create_indexes = commands.add_parser(
+        "create-indexes", help="Crea los índices declarados en los modelos sobre tablas existentes"
+    )
+    create_indexes.set_defaults(handler=cmd_create_indexes)
+
+    explain_check = commands.add_parser(
+        "explain-check", help="EXPLAIN de las consultas calientes; falla si alguna recorre la tabla completa"
+    )
+    explain_check.add_argument("--verbose", action="store_true", help="Muestra el plan de todas las consultas")
+    explain_check.set_defaults(handler=cmd_explain_check)
+
+    snapshot = commands.add_parser(
+        "snapshot", help="Snapshot columnar (Parquet/Arrow) de las tablas de un usuario"
+    )
+    snapshot.add_argument("--user-id", type=int, required=True)
+    snapshot.add_argument("--out", default="snapshots")
+    snapshot.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    snapshot.set_defaults(handler=cmd_snapshot)
+
+    args = parser.parse_args(argv)
+    SQLModel.metadata.create_all(engine)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+GET condicionales: ETag a partir de las versiones por recurso del usuario
+(app/services/versions.py) y 304 si coincide con `If-None-Match`.
+
+La dependencia corre ANTES del handler, así que un 304 no ejecuta la consulta
+del endpoint ni serializa nada: solo cuesta leer las versiones (una consulta
+por la PK).
+
+    @router.get("/status", dependencies=[Depends(conditional(BUDGET))])
+"""
+from datetime import datetime
+from typing import Iterable, Optional
+
+from fastapi import Depends, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.security import get_current_user
+from app.db.session import get_async_session
+from app.models.base import User
+from app.services.versions import read_versions
+
+CACHE_CONTROL = "private, no-cache" # El navegador guarda la respuesta pero siempre revalida
+
+
+class NotModified(Exception):
+    """Se lanza desde la dependencia; el handler de main.py responde 304."""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def build_etag(user_id: int, versions: dict, day: Optional[str] = None) -> str:
+    # Débil (W/): el mismo contenido puede viajar comprimido o no
+    parts = [f"u{user_id}"] + [f"{resource}.{version}" for resource, version in versions.items()]
+    if day:
+        parts.append(day)
+    return 'W/"' + "-".join(parts) + '"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (lista separada por comas o "*")."""
+    if not header:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+async def check_not_modified(
+    request: Request,
+    response: Response,
+    session: AsyncSession,
+    user_id: int,
+    resources: Iterable[str],
+    daily: bool = False,
+) -> None:
+    """Lanza NotModified si el ETag coincide; si no, lo pone en la respuesta."""
+    versions = await session.run_sync(read_versions, user_id, resources)
+    day = datetime.utcnow().date().isoformat() if daily else None
+    etag = build_etag(user_id, versions, day)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise NotModified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def conditional(*resources: str, daily: bool = False):
+    """
+    Dependencia para un GET que solo depende de `resources`. Con `daily=True`
+    el ETag incluye la fecha (para respuestas que cambian con el día, como
+    los pronósticos).
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_async_session),
+        current_user: User = Depends(get_current_user),
+    ) -> None:
+        await check_not_modified(request, response, session, current_user.id, resources, daily)
+
+    return dependency
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": CACHE_CONTROL})
@@ -11,6 +11,37 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # SQL: eco en consola y perfilado por petición (Server-Timing + log de lentas)
+    SQL_ECHO: bool = False
+    SQL_PROFILING: bool = False
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_SAMPLE_RATE: float = 1.0
+    SQL_REPEAT_THRESHOLD: int = 5
+
+    # Hashing de contraseñas (bcrypt): factor de trabajo y ejecutor dedicado
+    BCRYPT_ROUNDS: int = 12
+    HASH_WORKERS: int = 4
+    HASH_QUEUE_LIMIT: int = 32
+
+    # Caché de tokens verificados y usuarios autenticados
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # Escaneos de gastos recurrentes en segundo plano
+    SCAN_WORKERS: int = 4
+    SCAN_JOB_TTL_SECONDS: int = 3600
+    # Duración máxima de una transacción de escritura (p. ej. una carga masiva):
+    # pasado este tiempo, los ids asignados antes ya están confirmados o descartados
+    SCAN_WATERMARK_LAG_SECONDS: int = 900
+
+    # Pronósticos (metas de ahorro, balance): caché por usuario
+    FORECAST_CACHE_SIZE: int = 10000
+    FORECAST_CACHE_TTL_SECONDS: int = 600
+
+    # Listas grandes: columnas como tuplas + orjson (sin validar cada objeto) y gzip
+    FAST_JSON_LISTS: bool = True
+    GZIP_MIN_BYTES: int = 1024
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,50 @@
+"""
+Serialización rápida de listas (historial, deudas, metas).
+
+Por defecto FastAPI re-valida cada objeto del ORM contra el `response_model`
+y lo codifica con el JSON de la stdlib; con miles de filas eso cuesta más CPU
+que la consulta. Aquí:
+1. Se seleccionan solo las columnas del schema de respuesta (tuplas, sin ORM).
+2. Se codifican con orjson directo, sin validar objeto por objeto.
+3. Si el cuerpo es grande y el cliente acepta gzip, se comprime.
+
+El JSON es el mismo que el del camino normal (mismas llaves y en el mismo
+orden). Se apaga con FAST_JSON_LISTS=false y los handlers vuelven a devolver
+objetos del ORM.
+"""
+import zlib
+from typing import Sequence
+
+import orjson
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+GZIP_LEVEL = 6
+
+
+def list_columns(model, schema) -> list:
+    """Qué seleccionar: las columnas del schema (modo rápido) o el modelo completo."""
+    if not settings.FAST_JSON_LISTS:
+        return [model]
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def list_response(request: Request, response: Response, rows: Sequence, schema):
+    """
+    Respuesta de una lista seleccionada con `list_columns`. Conserva los
+    headers que ya pusieron el handler y sus dependencias (ETag, cursor).
+    """
+    if not settings.FAST_JSON_LISTS:
+        return rows
+
+    fields = list(schema.model_fields)
+    body = orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+    headers = dict(response.headers)
+    headers["Vary"] = "Accept-Encoding"
+    if len(body) >= settings.GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        compressor = zlib.compressobj(GZIP_LEVEL, wbits=16 + zlib.MAX_WBITS)
+        body = compressor.compress(body) + compressor.flush()
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
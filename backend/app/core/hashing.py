@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+
+class BoundedExecutor:
+    """
+    Ejecutor dedicado para trabajo de CPU pesado (bcrypt).
+    Admite `workers` tareas corriendo + `queue_limit` en espera; si se llena,
+    rechaza al instante con 503 en lugar de acaparar los hilos del servidor.
+    `run` se espera con await: mientras bcrypt corre, la petición no ocupa
+    ni el event loop ni un hilo del threadpool de FastAPI.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, name: str):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.rejected = 0
+        self.completed = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servidor ocupado, intenta de nuevo en unos segundos",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        # El cupo se libera cuando termina el hilo, aunque la petición se cancele antes
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
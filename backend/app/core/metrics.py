@@ -0,0 +1,237 @@
+"""
+Métricas operativas en formato de texto de Prometheus (GET /metrics).
+
+Implementación mínima y barata: contadores, gauges e histogramas con etiquetas
+guardados en dicts bajo un lock; los gauges "de lectura" (pool de conexiones,
+cachés, bcrypt) se calculan solo cuando alguien hace scrape.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.routing import Match
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        # Por etiquetas: [conteos por bucket (no acumulados)..., +Inf], suma
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = self.header()
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class GaugeCallback(_Metric):
+    """Métrica calculada al hacer scrape: `collect()` devuelve [(etiquetas, valor)]."""
+
+    def __init__(self, name, documentation, labelnames, collect: Callable[[], Iterable[Tuple[LabelValues, float]]], kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in self.collect()
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter(
+    "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status")
+))
+ERRORS = registry.register(Counter(
+    "http_request_errors_total", "Peticiones que terminaron en 5xx o excepción", ("method", "route")
+))
+LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP", ("method", "route")
+))
+IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "Peticiones en curso", ("method", "route")
+))
+POOL_WAIT = registry.register(Histogram(
+    "db_pool_wait_seconds", "Tiempo esperando una conexión del pool", ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))
+
+
+# --- Pool de conexiones -----------------------------------------------------
+
+def timed_pool_class(engine_name: str, async_pool: bool = False):
+    """Clase de pool que mide el tiempo de espera al pedir una conexión."""
+    base = AsyncAdaptedQueuePool if async_pool else QueuePool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return base._do_get(self)
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started, (engine_name,))
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def register_pool_gauges(engines: Dict[str, object]) -> None:
+    """Gauges de conexiones en uso / overflow / tamaño de cada motor."""
+    def pools():
+        for name, engine in engines.items():
+            pool = getattr(engine, "sync_engine", engine).pool
+            if isinstance(pool, QueuePool):
+                yield name, pool
+
+    registry.register(GaugeCallback(
+        "db_pool_checked_out", "Conexiones prestadas", ("engine",),
+        lambda: [((name,), pool.checkedout()) for name, pool in pools()],
+    ))
+    registry.register(GaugeCallback(
+        "db_pool_overflow", "Conexiones por encima del tamaño base del pool", ("engine",),
+        lambda: [((name,), max(pool.overflow(), 0)) for name, pool in pools()],
+    ))
+    registry.register(GaugeCallback(
+        "db_pool_size", "Tamaño base del pool", ("engine",),
+        lambda: [((name,), pool.size()) for name, pool in pools()],
+    ))
+
+
+# --- Middleware --------------------------------------------------------------
+
+def _route_template(app, scope) -> str:
+    """Plantilla de la ruta ("/analysis/{expense_id}") para no disparar la cardinalidad."""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, fastapi_app=None):
+        self.app = app
+        self.fastapi_app = fastapi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(self.fastapi_app, scope)
+        labels = (method, route)
+        status_holder = {"status": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc(labels)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            LATENCY.observe(time.perf_counter() - started, labels)
+            IN_FLIGHT.dec(labels)
+            status = status_holder["status"]
+            REQUESTS.inc((method, route, str(status)))
+            if status >= 500:
+                ERRORS.inc(labels)
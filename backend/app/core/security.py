@@ -1,19 +1,35 @@
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+import time
+from typing import Any, Union, Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
-from app.db.session import get_session
+from app.core.cache import TTLCache
+from app.core.hashing import BoundedExecutor
+from app.db.session import get_async_session
 # Importamos el modelo User. Nota: Usamos una importación condicional o directa si no hay ciclos.
 # Para evitar ciclos circulares simples, a veces se importa dentro de la función, 
 # pero aquí asumiremos que models.base no importa security.
 from app.models.base import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min = max = rounds: cualquier hash con otro factor de trabajo "necesita update"
+# y se re-hashea de forma transparente en el próximo login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt corre en su propio pool acotado (503 inmediato si se satura)
+hash_executor = BoundedExecutor(settings.HASH_WORKERS, settings.HASH_QUEUE_LIMIT, name="bcrypt")
 
 # Esto le dice a FastAPI dónde obtener el token (del endpoint /auth/login)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -28,32 +44,77 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hash_executor.run(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica y, si el hash usa otro factor de trabajo, devuelve el hash nuevo."""
+    return await hash_executor.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    return await hash_executor.run(pwd_context.hash, password)
+
+# ⚡ Cachés del proceso: token verificado -> user_id, y user_id -> snapshot del usuario
+token_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
+
+def user_cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+# Invalidación automática: cualquier cambio o borrado de un User hecho con el ORM
+# (p. ej. activar premium) saca su snapshot de la caché, al hacer flush y de nuevo
+# tras el commit. Los cambios hechos fuera del ORM caducan por TTL.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+            invalidate_user(obj.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_user(user_id)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+def _decode_user_id(token: str) -> Optional[int]:
+    """Verifica el JWT (o lo toma de la caché) y devuelve el id del usuario."""
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+    # Nunca cacheamos más allá de la expiración del propio token
+    token_cache.set(token, user_id, ttl=payload.get("exp", 0) - time.time())
+    return user_id
 
 # 👇 NUEVA FUNCIÓN: Valida el token y devuelve el usuario actual
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    user_id = _decode_user_id(token)
+    if user_id is None:
         raise credentials_exception
-    
-    user = session.get(User, int(user_id))
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return User(**snapshot)
+
+    user = await session.get(User, user_id)
     if user is None:
         raise credentials_exception
-        
-    return user
\ No newline at end of file
+
+    user_cache.set(user_id, user.model_dump())
+    return user
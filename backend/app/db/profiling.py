@@ -0,0 +1,127 @@
+"""
+Perfilado de SQL por petición (opt-in con SQL_PROFILING=true).
+
+Se engancha a los eventos del motor de SQLAlchemy y acumula, por petición:
+número de consultas, tiempo total en DB, las más lentas y las sentencias
+repetidas (síntoma de N+1). El resultado sale en el header `Server-Timing`
+y en un log de consultas lentas muestreado.
+"""
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+SLOWEST_KEPT = 3
+STATEMENT_PREVIEW = 200
+
+
+class RequestProfile:
+    __slots__ = ("count", "db_seconds", "slowest", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.slowest: List[Tuple[float, str]] = []
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.db_seconds += seconds
+        self.statements[statement] += 1
+        if len(self.slowest) < SLOWEST_KEPT or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Sentencias idénticas ejecutadas SQL_REPEAT_THRESHOLD veces o más."""
+        return [
+            (statement, times) for statement, times in self.statements.items()
+            if times >= settings.SQL_REPEAT_THRESHOLD
+        ]
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+def _preview(statement: str) -> str:
+    return " ".join(statement.split())[:STATEMENT_PREVIEW]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_started"].pop()
+    profile = _current.get()
+    if profile is not None:
+        profile.record(statement, seconds)
+
+    if seconds * 1000 >= settings.SLOW_QUERY_MS and random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+        logger.warning("🐢 Consulta lenta (%.1f ms): %s", seconds * 1000, _preview(statement))
+
+
+def install_profiling(engine) -> None:
+    """Registra los eventos en un motor síncrono (o en `async_engine.sync_engine`)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLProfilingMiddleware:
+    """Middleware ASGI: abre un perfil por petición y lo publica en los headers."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                total_ms = (time.perf_counter() - started) * 1000
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={profile.db_seconds * 1000:.1f};desc="{profile.count} queries", '
+                    f"app;dur={total_ms:.1f}",
+                )
+                headers["X-DB-Query-Count"] = str(profile.count)
+                repeated = profile.repeated()
+                if repeated:
+                    headers["X-DB-Repeated-Queries"] = str(len(repeated))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._report(scope, profile)
+
+    @staticmethod
+    def _report(scope, profile: RequestProfile) -> None:
+        path = f"{scope.get('method', '')} {scope.get('path', '')}"
+        for statement, times in profile.repeated():
+            logger.warning("🔁 Posible N+1 en %s: %dx %s", path, times, _preview(statement))
+
+        if profile.db_seconds * 1000 >= settings.SLOW_QUERY_MS and random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+            slowest = "; ".join(f"{seconds * 1000:.1f} ms {_preview(sql)}" for seconds, sql in profile.slowest)
+            logger.warning(
+                "🐢 Petición lenta en DB %s: %d consultas, %.1f ms. Más lentas: %s",
+                path, profile.count, profile.db_seconds * 1000, slowest,
+            )
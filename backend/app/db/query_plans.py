@@ -0,0 +1,133 @@
+"""
+Planes de ejecución de las consultas calientes.
+
+`check_plans()` corre EXPLAIN sobre cada consulta y marca como regresión
+cualquier recorrido completo de tabla (SQLite: `SCAN <tabla>`, Postgres:
+`Seq Scan`) o un ordenamiento en memoria donde el índice debería dar el orden.
+En Postgres se desactiva enable_seqscan para que el resultado no dependa del
+tamaño de las tablas (con tablas chicas el planner prefiere el Seq Scan).
+"""
+from datetime import date, datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.engine import Engine
+from sqlmodel import select, col
+
+from app.models.base import (
+    BudgetCategory, DailyBalance, Debt, MonthlyCategoryTotal, PeriodClose, RecurringExpense, SavingGoal, Transaction
+)
+from app.services.recurring import new_rows_statement
+
+USER_ID = 1
+
+
+class HotQuery(NamedTuple):
+    name: str
+    build: Callable
+    ordered: bool = False # True: el índice debe entregar el orden (sin sort aparte)
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("categoría por nombre (alta de gasto)", lambda: (
+        update(BudgetCategory)
+        .where(BudgetCategory.user_id == USER_ID)
+        .where(BudgetCategory.name == "Comida")
+        .values(spent_amount=BudgetCategory.spent_amount + 1)
+    )),
+    HotQuery("historial: primera página", lambda: (
+        select(Transaction)
+        .where(Transaction.user_id == USER_ID)
+        .order_by(col(Transaction.date).desc(), col(Transaction.id).desc())
+        .limit(51)
+    ), ordered=True),
+    HotQuery("historial: página con cursor", lambda: (
+        select(Transaction)
+        .where(Transaction.user_id == USER_ID)
+        .where(or_(
+            Transaction.date < datetime(2025, 1, 1),
+            and_(Transaction.date == datetime(2025, 1, 1), col(Transaction.id) < 1000),
+        ))
+        .order_by(col(Transaction.date).desc(), col(Transaction.id).desc())
+        .limit(51)
+    ), ordered=True),
+    # La misma sentencia del servicio, no una copia que pueda divergir
+    HotQuery("recurrentes: movimientos tras la marca de agua", lambda: new_rows_statement(USER_ID, 1000), ordered=True),
+    HotQuery("recurrentes detectados del usuario", lambda: (
+        select(RecurringExpense.name).where(RecurringExpense.user_id == USER_ID)
+    )),
+    HotQuery("deudas del usuario", lambda: select(Debt).where(Debt.user_id == USER_ID)),
+    HotQuery("metas del usuario", lambda: select(SavingGoal).where(SavingGoal.user_id == USER_ID)),
+    HotQuery("categorías del usuario", lambda: (
+        select(BudgetCategory).where(BudgetCategory.user_id == USER_ID)
+    )),
+    HotQuery("resumen: días del periodo", lambda: (
+        select(DailyBalance)
+        .where(DailyBalance.user_id == USER_ID)
+        .where(DailyBalance.day >= date(2025, 1, 1))
+        .where(DailyBalance.day <= date(2025, 1, 31))
+        .order_by(DailyBalance.day)
+    ), ordered=True),
+    HotQuery("tendencia mensual por categoría", lambda: (
+        select(MonthlyCategoryTotal)
+        .where(MonthlyCategoryTotal.user_id == USER_ID)
+        .where(MonthlyCategoryTotal.month >= date(2023, 1, 1))
+        .where(MonthlyCategoryTotal.month <= date(2024, 12, 1))
+        .order_by(MonthlyCategoryTotal.month, MonthlyCategoryTotal.category, MonthlyCategoryTotal.type)
+    ), ordered=True),
+    HotQuery("cierres ya registrados del periodo", lambda: (
+        select(PeriodClose.user_id)
+        .where(PeriodClose.kind == "budget")
+        .where(PeriodClose.period == "2025-01")
+        .where(col(PeriodClose.user_id).in_([1, 2, 3]))
+    )),
+]
+
+
+def explain(engine: Engine, statement) -> List[str]:
+    """Líneas del plan de `statement` en el dialecto del motor."""
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    sql = str(compiled)
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in rows]
+
+        with connection.begin():
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            return [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {sql}", params)]
+
+
+def plan_problems(dialect: str, plan: List[str], ordered: bool) -> List[str]:
+    problems = []
+    for line in plan:
+        text = line.strip()
+        if dialect == "sqlite":
+            if text.startswith("SCAN") and "CONSTANT ROW" not in text:
+                problems.append(text)
+            elif ordered and "TEMP B-TREE" in text:
+                problems.append(text)
+        else:
+            if "Seq Scan" in text:
+                problems.append(text)
+            elif ordered and text.lstrip("-> ").startswith(("Sort", "Incremental Sort")):
+                problems.append(text)
+    return problems
+
+
+def check_plans(engine: Engine) -> List[dict]:
+    """Corre EXPLAIN sobre cada consulta caliente y devuelve plan y problemas."""
+    results = []
+    for query in HOT_QUERIES:
+        plan = explain(engine, query.build())
+        results.append({
+            "name": query.name,
+            "plan": plan,
+            "problems": plan_problems(engine.dialect.name, plan, query.ordered),
+        })
+    return results
@@ -1,16 +1,59 @@
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
+from app.core.metrics import timed_pool_class
 
 # Supabase requiere SSL mode 'require' para conexiones seguras
 # Y a veces el string empieza con postgres:// pero Python necesita postgresql://
 connection_string = settings.DATABASE_URL.replace("postgres://", "postgresql://")
 
+# Pools que miden la espera por conexión (/metrics); SQLite en memoria usa su pool propio
+timed_pools = ":memory:" not in connection_string
+
+# Motor síncrono: scripts, CLI y workers en segundo plano
 engine = create_engine(
-    connection_string, 
-    echo=True, # Esto imprimirá las consultas SQL en la consola (útil para depurar)
-    connect_args={"check_same_thread": False} if "sqlite" in connection_string else {} 
+    connection_string,
+    echo=settings.SQL_ECHO, # SQL_ECHO=true imprime las consultas en consola (solo para depurar)
+    connect_args={"check_same_thread": False} if "sqlite" in connection_string else {},
+    **({"poolclass": timed_pool_class("sync")} if timed_pools else {}),
 )
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def run_in_session(fn, *args):
+    """
+    Corre un servicio síncrono pesado (escaneo, carga masiva, snapshot) en el
+    threadpool con su propia Session. Con `AsyncSession.run_sync` el trabajo
+    de CPU corre en el hilo del event loop y frena a todas las demás peticiones.
+    """
+    def call():
+        # expire_on_commit=False: los objetos devueltos se leen ya cerrada la sesión
+        with Session(engine, expire_on_commit=False) as session:
+            return fn(session, *args)
+    return await run_in_threadpool(call)
+
+# ⚡ Motor asíncrono para los routers: asyncpg (Postgres) / aiosqlite (local y pruebas)
+def to_async_url(url: str) -> str:
+    for prefix, driver in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(prefix):
+            return driver + url[len(prefix):]
+    return url
+
+async_engine = create_async_engine(
+    to_async_url(connection_string),
+    echo=settings.SQL_ECHO,
+    **({"poolclass": timed_pool_class("async", async_pool=True)} if timed_pools else {}),
+)
+
+async def get_async_session():
+    # expire_on_commit=False: tras el commit no hay recargas perezosas (que en async fallan)
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -1,10 +1,15 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel import SQLModel
 
 from app.core.config import settings
-from app.db.session import engine
+from app.db.session import engine, async_engine
+from app.db.profiling import install_profiling, SQLProfilingMiddleware
+from app.core.security import user_cache_stats, token_cache, user_cache, hash_executor
+from app.core.metrics import registry, register_pool_gauges, GaugeCallback, MetricsMiddleware
+from app.core.conditional import NotModified, not_modified_handler
 
 # Importamos modelos
 from app.models.base import User, SavingGoal, Debt, BudgetCategory, Transaction
@@ -17,6 +22,8 @@ from app.api.budget import router as budget_router
 from app.api.debts import router as debts_router
 from app.api.savings import router as savings_router # 👈 NUEVO
 from app.api.analysis import router as analysis_router # 👈 NUEVO
+from app.api.snapshot import router as snapshot_router
+from app.api.dashboard import router as dashboard_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -37,8 +44,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-DB-Query-Count", "ETag"],
 )
 
+# 🏷️ GET condicionales: la dependencia `conditional` lanza NotModified -> 304
+app.add_exception_handler(NotModified, not_modified_handler)
+
+# 🔬 Perfilado de SQL por petición (opt-in: SQL_PROFILING=true)
+if settings.SQL_PROFILING:
+    install_profiling(engine)
+    install_profiling(async_engine.sync_engine)
+    app.add_middleware(SQLProfilingMiddleware)
+
+# 📈 Métricas (/metrics): por ruta, pool de conexiones, cachés y bcrypt
+app.add_middleware(MetricsMiddleware, fastapi_app=app)
+register_pool_gauges({"sync": engine, "async": async_engine})
+registry.register(GaugeCallback(
+    "auth_cache_events_total", "Aciertos/fallos/desalojos de las cachés de autenticación",
+    ("cache", "result"),
+    lambda: [
+        ((name, result), getattr(cache, result))
+        for name, cache in (("tokens", token_cache), ("users", user_cache))
+        for result in ("hits", "misses", "evictions")
+    ],
+    kind="counter",
+))
+registry.register(GaugeCallback(
+    "password_hash_pending", "Hashes bcrypt corriendo o en cola", (),
+    lambda: [((), hash_executor.stats()["pending"])],
+))
+registry.register(GaugeCallback(
+    "password_hash_rejected_total", "Hashes bcrypt rechazados con 503 por saturación", (),
+    lambda: [((), hash_executor.rejected)],
+    kind="counter",
+))
+
 # Registramos las rutas
 app.include_router(transactions_router, prefix="/transactions", tags=["Transacciones"])
 app.include_router(users_router, prefix="/users", tags=["Usuarios"])
@@ -47,7 +87,18 @@ app.include_router(budget_router, prefix="/budget", tags=["Presupuesto"])
 app.include_router(debts_router, prefix="/debts", tags=["Deudas"])
 app.include_router(savings_router, prefix="/savings", tags=["Ahorros"]) # 👈 REGISTRADO
 app.include_router(analysis_router, prefix="/analysis", tags=["Inteligencia Artificial 🧠"])
+app.include_router(snapshot_router, prefix="/snapshot", tags=["Exportación"])
+app.include_router(dashboard_router, prefix="/dashboard", tags=["Dashboard"])
 
 @app.get("/")
 def root():
-    return {"message": "¡Hola! La API de Finanzas está corriendo y conectada a la DB 🚀"}
\ No newline at end of file
+    return {"message": "¡Hola! La API de Finanzas está corriendo y conectada a la DB 🚀"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/health/cache")
+def cache_stats():
+    """Aciertos/fallos de la caché de autenticación (para ajustar USER_CACHE_SIZE)."""
+    return user_cache_stats()
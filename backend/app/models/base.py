@@ -1,4 +1,5 @@
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 from datetime import datetime, date
 
@@ -14,7 +15,7 @@ class User(SQLModel, table=True):
 # 2. TABLA DE METAS DE AHORRO
 class SavingGoal(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     name: str
     target_amount: float
     current_amount: float = 0.0
@@ -25,7 +26,7 @@ class SavingGoal(SQLModel, table=True):
 # 3. TABLA DE DEUDAS
 class Debt(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     name: str
     total_amount: float
     current_balance: float # Lo que falta por pagar
@@ -35,6 +36,9 @@ class Debt(SQLModel, table=True):
 
 # 4. TABLA DE CATEGORÍAS DE PRESUPUESTO
 class BudgetCategory(SQLModel, table=True):
+    # Cada gasto busca su categoría por (usuario, nombre): índice único
+    __table_args__ = (Index("uq_budgetcategory_user_name", "user_id", "name", unique=True),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     name: str
@@ -46,6 +50,13 @@ class BudgetCategory(SQLModel, table=True):
 
 # 5. TABLA DE TRANSACCIONES (MODIFICADA 🟢)
 class Transaction(SQLModel, table=True):
+    __table_args__ = (
+        # Historial paginado (user_id, date desc, id desc), resúmenes y exportación
+        Index("ix_transaction_user_date", "user_id", "date", "id"),
+        # Escaneo incremental de recurrentes (user_id, id > marca de agua)
+        Index("ix_transaction_user_id", "user_id", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     
@@ -59,8 +70,46 @@ class Transaction(SQLModel, table=True):
     description: str
     date: datetime = Field(default_factory=datetime.utcnow)
 
+# 6. TOTALES ACUMULADOS (Resumen de balance sin recorrer el historial)
+class UserBalance(SQLModel, table=True):
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    total_income: float = 0.0
+    total_expense: float = 0.0
+    tx_count: int = 0
+
+class DailyBalance(SQLModel, table=True):
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    income: float = 0.0
+    expense: float = 0.0
+    tx_count: int = 0
+
+# Gasto/ingreso por mes y categoría (tendencias y presupuesto vs real)
+class MonthlyCategoryTotal(SQLModel, table=True):
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    month: date = Field(primary_key=True) # Día 1 del mes
+    category: str = Field(primary_key=True)
+    type: str = Field(primary_key=True) # income, expense
+    amount: float = 0.0
+    tx_count: int = 0
+
+# 7. CIERRES DE PERIODO (idempotencia del cierre de mes y de los intereses)
+class PeriodClose(SQLModel, table=True):
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    kind: str = Field(primary_key=True) # "budget" | "interest"
+    period: str = Field(primary_key=True) # "AAAA-MM"
+    closed_at: datetime = Field(default_factory=datetime.utcnow)
+
+# 8. VERSIONES POR RECURSO (ETag de los GET condicionales)
+class ResourceVersion(SQLModel, table=True):
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    resource: str = Field(primary_key=True) # "transactions" | "budget" | "debts" | "savings" | "recurring"
+    version: int = 0
+
 # --- TABLAS DEL DIFERENCIADOR ---
 class RecurringExpense(SQLModel, table=True):
+    __table_args__ = (Index("ix_recurringexpense_user_name", "user_id", "name"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     name: str
@@ -72,6 +121,28 @@ class RecurringExpense(SQLModel, table=True):
     is_ignored: bool = False
     last_charged_date: Optional[date] = None
 
+# Estado del escaneo incremental de gastos recurrentes
+class RecurringScanState(SQLModel, table=True):
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    last_transaction_id: int = 0 # Marca de agua: último movimiento procesado
+    scanned_at: Optional[datetime] = None
+    # Ids más bajos que confirman después del escaneo (ver recurring._check_late_rows)
+    safe_transaction_id: int = 0 # Todo id <= este ya se procesó
+    checkpoint_id: int = 0 # Id máximo global visto en checkpoint_at
+    checkpoint_at: Optional[datetime] = None
+    checkpoint_count: int = 0 # Procesados en (safe_transaction_id, checkpoint_id]
+    processed_after_checkpoint: int = 0 # Procesados con id > checkpoint_id
+
+class RecurringGroupState(SQLModel, table=True):
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    name: str = Field(primary_key=True) # Descripción normalizada ("spotify")
+    count: int = 0
+    first_date: datetime
+    last_date: datetime
+    amount_sum: float = 0.0
+    amount_sq_sum: float = 0.0
+    max_gap_days: Optional[int] = None
+
 class FamilyGroup(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
@@ -0,0 +1,44 @@
+from sqlmodel import SQLModel
+from typing import Optional, List
+from datetime import date
+
+# Estado de un escaneo en segundo plano
+class ScanJobRead(SQLModel):
+    job_id: str
+    status: str # queued | running | done | failed
+    progress: float
+    full: bool
+    result: Optional[List[dict]] = None # Gastos detectados (mismo formato que /scan-recurring)
+    error: Optional[str] = None
+
+# Tendencia mensual por categoría (rollup MonthlyCategoryTotal)
+class MonthlyTotalRead(SQLModel):
+    month: str # "AAAA-MM"
+    category: str
+    type: str
+    amount: float
+    tx_count: int
+
+# 📈 Pronóstico de flujo de caja
+class UpcomingCharge(SQLModel):
+    date: date
+    name: str
+    amount: float
+    frequency: str
+
+class ForecastDay(SQLModel):
+    date: date
+    balance: float
+    charges: float # Cobros recurrentes de ese día
+
+class CashFlowForecast(SQLModel):
+    start_balance: float
+    daily_income: float # Promedio reciente
+    daily_spending: float # Gasto variable promedio (sin recurrentes)
+    horizon_days: int
+    low_balance_threshold: float
+    low_balance_date: Optional[date] # Primer día por debajo del umbral
+    min_balance: float
+    min_balance_date: date
+    upcoming_charges: List[UpcomingCharge]
+    days: List[ForecastDay]
@@ -14,4 +14,12 @@ class CategoryRead(CategoryBase):
     id: int
     user_id: int
     spent_amount: float
-    rollover_amount: float = 0.0 # 🟢 Agregado
\ No newline at end of file
+    rollover_amount: float = 0.0 # 🟢 Agregado
+# 🚦 Estado del presupuesto (alertas)
+class BudgetStatusItem(SQLModel):
+    category: str
+    spent: float
+    limit: float # Límite base + rollover
+    percentage: float
+    alert: str # normal | warning | critical
+    message: str
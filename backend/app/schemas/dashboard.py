@@ -0,0 +1,40 @@
+from sqlmodel import SQLModel
+from typing import Optional, List
+from datetime import date
+
+from app.models.base import RecurringExpense
+from app.schemas.budget import BudgetStatusItem
+from app.schemas.debt import DebtRead
+from app.schemas.transaction import BalanceSummary
+
+# 💳 Totales de deudas
+class DebtTotals(SQLModel):
+    count: int
+    total_amount: float # Suma de los préstamos originales
+    total_balance: float # Lo que falta por pagar
+    total_min_payment: float
+    paid_ratio: float # 0..1
+    debts: List[DebtRead]
+
+# 🎯 Avance de metas
+class GoalProgress(SQLModel):
+    id: int
+    name: str
+    target_amount: float
+    current_amount: float
+    progress: float # 0..1
+    deadline: Optional[date] = None
+
+class SavingsProgress(SQLModel):
+    total_target: float
+    total_saved: float
+    progress: float # 0..1
+    goals: List[GoalProgress]
+
+# 🏠 Todo el tablero en una sola respuesta (solo las secciones pedidas en `include`)
+class Dashboard(SQLModel):
+    summary: Optional[BalanceSummary] = None
+    budget: Optional[List[BudgetStatusItem]] = None
+    debts: Optional[DebtTotals] = None
+    savings: Optional[SavingsProgress] = None
+    recurring: Optional[List[RecurringExpense]] = None # Detecciones pendientes de confirmar
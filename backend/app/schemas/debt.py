@@ -1,5 +1,6 @@
-from sqlmodel import SQLModel
-from typing import Optional # 👈 No olvides importar esto
+from sqlmodel import SQLModel, Field
+from typing import Optional, List, Literal # 👈 No olvides importar esto
+from datetime import date
 
 # Lo que enviamos para crear una deuda
 class DebtCreate(SQLModel):
@@ -17,4 +18,40 @@ class DebtRead(DebtCreate):
     user_id: int # En la respuesta siempre devolvemos a quién pertenece
 # Lo que recibimos de vuelta
 class DebtRead(DebtCreate):
-    id: int
\ No newline at end of file
+    id: int
+# 🧮 Simulador de liquidación
+class DebtSimulationRequest(SQLModel):
+    extra_payment: float = Field(default=0.0, ge=0) # Extra mensual sobre la suma de mínimos
+    strategies: List[Literal["avalanche", "snowball", "custom"]] = ["avalanche", "snowball"]
+    custom_order: List[int] = [] # Ids de deuda en el orden deseado (estrategia "custom")
+    months: int = Field(default=360, ge=1, le=600) # Horizonte (30 años por defecto)
+
+class DebtPayoff(SQLModel):
+    debt_id: int
+    name: str
+    payoff_month: Optional[int] # None = no se liquida dentro del horizonte
+    payoff_date: Optional[date]
+    interest_paid: float
+
+class PayoffSchedulePoint(SQLModel):
+    month: int
+    date: date
+    total_balance: float
+    interest: float
+    paid: float
+    balances: List[float] # Mismo orden que `debts`
+
+class StrategyResult(SQLModel):
+    strategy: str
+    order: List[int]
+    months_to_debt_free: Optional[int]
+    debt_free_date: Optional[date]
+    total_interest: float
+    total_paid: float
+    debts: List[DebtPayoff]
+    schedule: List[PayoffSchedulePoint]
+
+class DebtSimulation(SQLModel):
+    extra_payment: float
+    start: date
+    results: List[StrategyResult]
@@ -17,4 +17,19 @@ class SavingRead(SavingCreate):
 
 # Lo que recibimos de vuelta
 class SavingRead(SavingCreate):
-    id: int
\ No newline at end of file
+    id: int
+
+# 🎯 Pronóstico de cumplimiento
+class GoalForecast(SQLModel):
+    goal_id: int
+    name: str
+    target_amount: float
+    current_amount: float
+    remaining: float
+    progress: float # 0..1
+    monthly_rate: float # Aporte mensual promedio reciente
+    projected_completion: Optional[date] # None = sin aportes recientes
+    deadline: Optional[date]
+    months_left: Optional[float]
+    required_monthly: Optional[float] # Lo que hace falta por mes para llegar a la fecha límite
+    status: str # completed | on_track | behind | overdue | no_deadline | no_contributions
@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, date
+from typing import Optional, List
 
 class TransactionBase(SQLModel):
     amount: float
@@ -16,4 +16,32 @@ class TransactionCreate(TransactionBase):
 
 class TransactionRead(TransactionBase):
     id: int
-    user_id: int
\ No newline at end of file
+    user_id: int
+
+# 📊 Resumen de balance (leído de los acumulados)
+class SummaryPoint(SQLModel):
+    period: str
+    income: float
+    expense: float
+    net: float
+
+class BalanceSummary(SQLModel):
+    balance: float
+    total_income: float
+    total_expense: float
+    date_from: date
+    date_to: date
+    period_income: float
+    period_expense: float
+    period_net: float
+    granularity: str
+    series: List[SummaryPoint]
+
+# 📦 Carga masiva
+class BulkRowError(SQLModel):
+    index: int
+    error: str
+
+class BulkResult(SQLModel):
+    inserted: int
+    errors: List[BulkRowError]
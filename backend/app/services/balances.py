@@ -0,0 +1,320 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, insert, tuple_, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.base import Transaction, UserBalance, DailyBalance, MonthlyCategoryTotal
+from app.services.versions import TRANSACTIONS, mark_changed
+
+
+def split_amount(tx_type: str, amount: float) -> Tuple[float, float]:
+    """Devuelve (ingreso, gasto): todo lo que no es 'income' resta del balance."""
+    if tx_type == "income":
+        return amount, 0.0
+    return 0.0, amount
+
+
+def bump_counters(session: Session, model, key: dict, deltas: dict) -> None:
+    """
+    Suma `deltas` a la fila `key` con un UPDATE atómico (col = col + delta).
+    Si la fila todavía no existe la insertamos; si otra petición la creó
+    justo antes, reintentamos el UPDATE.
+    """
+    statement = (
+        update(model)
+        .where(*[getattr(model, name) == value for name, value in key.items()])
+        .values({name: getattr(model, name) + delta for name, delta in deltas.items()})
+    )
+    if session.execute(statement).rowcount:
+        return
+    try:
+        with session.begin_nested():
+            session.execute(insert(model).values(**key, **deltas))
+    except IntegrityError:
+        session.execute(statement)
+
+
+def bump_counters_many(session: Session, model, rows: List[Tuple[dict, dict]]) -> None:
+    """
+    `bump_counters` para muchas filas con el mismo número de sentencias sin
+    importar el tamaño del lote: un SELECT de las llaves que ya existen, un
+    UPDATE (executemany) para esas y un INSERT (executemany) para las nuevas.
+    Si otra petición insertó alguna de las nuevas justo antes, esas se
+    reintentan una por una con `bump_counters`.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    key_names = list(rows[0][0])
+    delta_names = list(rows[0][1])
+    key_columns = [table.c[name] for name in key_names]
+
+    # 1. Llaves que ya tienen fila
+    wanted = [tuple(key[name] for name in key_names) for key, _ in rows]
+    existing = set(session.execute(select(*key_columns).where(tuple_(*key_columns).in_(wanted))).all())
+    present = [(key, deltas) for key, deltas in rows if tuple(key[name] for name in key_names) in existing]
+    missing = [(key, deltas) for key, deltas in rows if tuple(key[name] for name in key_names) not in existing]
+
+    # 2. UPDATE atómico (col = col + delta) de todas las existentes en un executemany
+    if present:
+        session.execute(
+            update(table)
+            .where(*[column == bindparam(f"key_{column.name}") for column in key_columns])
+            .values({name: table.c[name] + bindparam(f"delta_{name}") for name in delta_names}),
+            [
+                {**{f"key_{name}": key[name] for name in key_names},
+                 **{f"delta_{name}": deltas[name] for name in delta_names}}
+                for key, deltas in present
+            ],
+        )
+
+    # 3. INSERT de las nuevas; ante una carrera, fila por fila
+    if missing:
+        try:
+            with session.begin_nested():
+                session.execute(insert(table), [{**key, **deltas} for key, deltas in missing])
+        except IntegrityError:
+            for key, deltas in missing:
+                bump_counters(session, model, key, deltas)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Día 1 del mes desplazado `months` meses (negativo hacia atrás)."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def record_transactions(session: Session, user_id: int, rows: Iterable[Tuple[str, float, datetime, str]]) -> None:
+    """
+    Acumula (type, amount, date, category) en los totales del usuario
+    (balance, días y meses por categoría).
+    Se llama dentro de la misma transacción que inserta los movimientos.
+    """
+    total_income = total_expense = 0.0
+    count = 0
+    per_day: Dict[date, List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+    per_month: Dict[Tuple[date, str, str], List[float]] = defaultdict(lambda: [0.0, 0])
+
+    for tx_type, amount, tx_date, category in rows:
+        income, expense = split_amount(tx_type, amount)
+        total_income += income
+        total_expense += expense
+        count += 1
+        day = per_day[tx_date.date()]
+        day[0] += income
+        day[1] += expense
+        day[2] += 1
+        month = per_month[(month_start(tx_date.date()), category, tx_type)]
+        month[0] += amount
+        month[1] += 1
+
+    if not count:
+        return
+
+    bump_counters(
+        session, UserBalance, {"user_id": user_id},
+        {"total_income": total_income, "total_expense": total_expense, "tx_count": count},
+    )
+    # Días y meses por categoría: sentencias fijas por lote (ver bump_counters_many)
+    bump_counters_many(session, DailyBalance, [
+        ({"user_id": user_id, "day": day}, {"income": income, "expense": expense, "tx_count": day_count})
+        for day, (income, expense, day_count) in per_day.items()
+    ])
+    bump_counters_many(session, MonthlyCategoryTotal, [
+        (
+            {"user_id": user_id, "month": month, "category": category, "type": tx_type},
+            {"amount": amount, "tx_count": month_count},
+        )
+        for (month, category, tx_type), (amount, month_count) in per_month.items()
+    ])
+
+
+def build_summary(
+    session: Session,
+    user_id: int,
+    date_from: date,
+    date_to: date,
+    granularity: str = "day",
+) -> dict:
+    """Resumen de balance leyendo solo los acumulados (no el historial)."""
+    totals = session.get(UserBalance, user_id) or UserBalance(user_id=user_id)
+
+    days = session.exec(
+        select(DailyBalance)
+        .where(DailyBalance.user_id == user_id)
+        .where(DailyBalance.day >= date_from)
+        .where(DailyBalance.day <= date_to)
+        .order_by(DailyBalance.day)
+    ).all()
+
+    # Agrupamos los días en el bucket pedido (día o mes)
+    buckets: Dict[str, List[float]] = {}
+    for row in days:
+        label = row.day.isoformat() if granularity == "day" else row.day.strftime("%Y-%m")
+        bucket = buckets.setdefault(label, [0.0, 0.0])
+        bucket[0] += row.income
+        bucket[1] += row.expense
+
+    period_income = sum(row.income for row in days)
+    period_expense = sum(row.expense for row in days)
+
+    return {
+        "balance": round(totals.total_income - totals.total_expense, 2),
+        "total_income": round(totals.total_income, 2),
+        "total_expense": round(totals.total_expense, 2),
+        "date_from": date_from,
+        "date_to": date_to,
+        "period_income": round(period_income, 2),
+        "period_expense": round(period_expense, 2),
+        "period_net": round(period_income - period_expense, 2),
+        "granularity": granularity,
+        "series": [
+            {
+                "period": label,
+                "income": round(income, 2),
+                "expense": round(expense, 2),
+                "net": round(income - expense, 2),
+            }
+            for label, (income, expense) in buckets.items()
+        ],
+    }
+
+
+def rebuild_balances(session: Session, user_id: Optional[int] = None, dry_run: bool = False) -> List[dict]:
+    """
+    Recalcula los acumulados desde la tabla Transaction.
+    Devuelve la deriva encontrada por usuario; con dry_run no escribe nada.
+    """
+    statement = select(
+        Transaction.user_id,
+        func.date(Transaction.date),
+        Transaction.type,
+        func.sum(Transaction.amount),
+        func.count(),
+    ).group_by(Transaction.user_id, func.date(Transaction.date), Transaction.type)
+    if user_id is not None:
+        statement = statement.where(Transaction.user_id == user_id)
+
+    expected_totals: Dict[int, List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+    expected_days: Dict[Tuple[int, date], List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+    for uid, raw_day, tx_type, amount, count in session.exec(statement):
+        day = raw_day if isinstance(raw_day, date) else date.fromisoformat(str(raw_day))
+        income, expense = split_amount(tx_type, amount)
+        for bucket in (expected_totals[uid], expected_days[(uid, day)]):
+            bucket[0] += income
+            bucket[1] += expense
+            bucket[2] += count
+
+    current = select(UserBalance)
+    if user_id is not None:
+        current = current.where(UserBalance.user_id == user_id)
+    stored = {row.user_id: row for row in session.exec(current)}
+
+    drift = []
+    for uid in sorted(set(expected_totals) | set(stored)):
+        income, expense, count = expected_totals.get(uid, (0.0, 0.0, 0))
+        row = stored.get(uid)
+        stored_values = (row.total_income, row.total_expense, row.tx_count) if row else (0.0, 0.0, 0)
+        if (
+            abs(stored_values[0] - income) > 0.005
+            or abs(stored_values[1] - expense) > 0.005
+            or stored_values[2] != count
+        ):
+            drift.append({
+                "user_id": uid,
+                "stored_balance": round(stored_values[0] - stored_values[1], 2),
+                "expected_balance": round(income - expense, 2),
+                "stored_count": stored_values[2],
+                "expected_count": count,
+            })
+
+    if dry_run:
+        return drift
+
+    # Reescribimos los acumulados completos del alcance pedido
+    for model in (DailyBalance, UserBalance):
+        wipe = delete(model)
+        if user_id is not None:
+            wipe = wipe.where(model.user_id == user_id)
+        session.execute(wipe)
+
+    if expected_totals:
+        session.execute(insert(UserBalance), [
+            {"user_id": uid, "total_income": v[0], "total_expense": v[1], "tx_count": v[2]}
+            for uid, v in expected_totals.items()
+        ])
+        session.execute(insert(DailyBalance), [
+            {"user_id": uid, "day": day, "income": v[0], "expense": v[1], "tx_count": v[2]}
+            for (uid, day), v in expected_days.items()
+        ])
+    mark_changed(session, {item["user_id"] for item in drift}, TRANSACTIONS)
+    session.commit()
+    return drift
+
+
+def read_monthly_totals(
+    session: Session,
+    user_id: int,
+    month_from: date,
+    month_to: date,
+    tx_type: Optional[str] = None,
+    category: Optional[str] = None,
+) -> List[MonthlyCategoryTotal]:
+    """Meses [month_from, month_to] del rollup: una lectura por rango de la PK."""
+    statement = (
+        select(MonthlyCategoryTotal)
+        .where(MonthlyCategoryTotal.user_id == user_id)
+        .where(MonthlyCategoryTotal.month >= month_start(month_from))
+        .where(MonthlyCategoryTotal.month <= month_start(month_to))
+        .order_by(MonthlyCategoryTotal.month, MonthlyCategoryTotal.category, MonthlyCategoryTotal.type)
+    )
+    if tx_type:
+        statement = statement.where(MonthlyCategoryTotal.type == tx_type)
+    if category:
+        statement = statement.where(MonthlyCategoryTotal.category == category)
+    return session.exec(statement).all()
+
+
+def rebuild_monthly_totals(session: Session, user_id: Optional[int] = None) -> int:
+    """
+    Backfill de MonthlyCategoryTotal desde Transaction. Agrupa por día (func.date
+    funciona igual en SQLite y Postgres) y pliega los días en meses en Python.
+    Devuelve cuántas filas quedaron.
+    """
+    statement = select(
+        Transaction.user_id,
+        func.date(Transaction.date),
+        Transaction.category,
+        Transaction.type,
+        func.sum(Transaction.amount),
+        func.count(),
+    ).group_by(Transaction.user_id, func.date(Transaction.date), Transaction.category, Transaction.type)
+    if user_id is not None:
+        statement = statement.where(Transaction.user_id == user_id)
+
+    months: Dict[Tuple[int, date, str, str], List[float]] = defaultdict(lambda: [0.0, 0])
+    for uid, raw_day, category, tx_type, amount, count in session.exec(statement):
+        day = raw_day if isinstance(raw_day, date) else date.fromisoformat(str(raw_day))
+        bucket = months[(uid, month_start(day), category, tx_type)]
+        bucket[0] += amount
+        bucket[1] += count
+
+    wipe = delete(MonthlyCategoryTotal)
+    if user_id is not None:
+        wipe = wipe.where(MonthlyCategoryTotal.user_id == user_id)
+    session.execute(wipe)
+    if months:
+        session.execute(insert(MonthlyCategoryTotal), [
+            {"user_id": uid, "month": month, "category": category, "type": tx_type, "amount": v[0], "tx_count": v[1]}
+            for (uid, month, category, tx_type), v in months.items()
+        ])
+    mark_changed(session, {key[0] for key in months} | ({user_id} if user_id is not None else set()), TRANSACTIONS)
+    session.commit()
+    return len(months)
@@ -0,0 +1,133 @@
+"""
+Pronóstico de flujo de caja: balance proyectado día a día.
+
+No relee el historial: parte de los acumulados (UserBalance para el balance
+actual, DailyBalance para los promedios recientes) y de los gastos
+recurrentes confirmados. Las fechas de cobro y la curva de balance se
+calculan con aritmética de fechas vectorizada (datetime64 + cumsum).
+
+    balance(d) = balance actual + Σ (ingreso diario - gasto variable diario - cobros del día)
+
+El gasto variable es el gasto diario promedio menos el equivalente diario de
+los recurrentes (que ya están dentro del historial y se proyectan aparte).
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.base import DailyBalance, RecurringExpense, UserBalance
+from app.services.recurrence_engine import CADENCES
+
+LOOKBACK_DAYS = 90
+# Historial corto: al menos un mes de denominador (una nómina recién cobrada
+# no se proyecta como ingreso de todos los días)
+MIN_OBSERVED_DAYS = 30
+PERIOD_DAYS = {name: period for name, period, _ in CADENCES}
+MONTH_STEPS = {"monthly": 1, "quarterly": 3, "annual": 12}
+DAY_STEPS = {"weekly": 7, "biweekly": 14}
+
+
+def charge_dates(
+    frequency: str,
+    detected_day: int,
+    last_charged: Optional[date],
+    start: date,
+    horizon_days: int,
+) -> np.ndarray:
+    """Fechas de cobro (datetime64[D]) en (start, start + horizon_days]."""
+    first = np.datetime64(start, "D")
+    end = first + horizon_days
+    anchor = np.datetime64(last_charged or start, "D")
+
+    if frequency in DAY_STEPS:
+        step = DAY_STEPS[frequency]
+        steps = np.arange(1, int((end - anchor).astype(int)) // step + 2)
+        dates = anchor + steps * step
+    else:
+        # Mensual/trimestral/anual: mismo día del mes (recortado a meses cortos)
+        step = MONTH_STEPS.get(frequency, 1)
+        anchor_month = anchor.astype("datetime64[M]")
+        months_ahead = int((end.astype("datetime64[M]") - anchor_month).astype(int))
+        months = anchor_month + np.arange(0, months_ahead // step + 2) * step
+        month_start = months.astype("datetime64[D]")
+        month_length = ((months + 1).astype("datetime64[D]") - month_start).astype(int)
+        dates = month_start + (np.minimum(detected_day, month_length) - 1)
+
+    mask = (dates > first) & (dates <= end)
+    if last_charged is not None:
+        mask &= dates > anchor
+    return dates[mask]
+
+
+def forecast_cash_flow(
+    session: Session,
+    user_id: int,
+    horizon_days: int = 90,
+    low_balance: float = 0.0,
+    today: Optional[date] = None,
+) -> dict:
+    today = today or datetime.utcnow().date()
+
+    totals = session.get(UserBalance, user_id)
+    start_balance = (totals.total_income - totals.total_expense) if totals else 0.0
+
+    # Promedios diarios recientes desde los acumulados por día (una consulta)
+    since = today - timedelta(days=LOOKBACK_DAYS - 1)
+    income, expense, first_day = session.exec(
+        select(func.sum(DailyBalance.income), func.sum(DailyBalance.expense), func.min(DailyBalance.day))
+        .where(DailyBalance.user_id == user_id)
+        .where(DailyBalance.day >= since)
+        .where(DailyBalance.day <= today)
+    ).one()
+    if isinstance(first_day, str):
+        first_day = date.fromisoformat(first_day)
+    observed_days = (today - first_day).days + 1 if first_day else LOOKBACK_DAYS
+    observed_days = max(observed_days, MIN_OBSERVED_DAYS)
+    daily_income = (income or 0.0) / observed_days
+    daily_expense = (expense or 0.0) / observed_days
+
+    recurring = session.exec(
+        select(RecurringExpense)
+        .where(RecurringExpense.user_id == user_id)
+        .where(RecurringExpense.is_confirmed == True) # noqa: E712
+        .where(RecurringExpense.is_ignored == False) # noqa: E712
+    ).all()
+    recurring_daily = sum(item.amount / PERIOD_DAYS.get(item.frequency, PERIOD_DAYS["monthly"]) for item in recurring)
+    daily_spending = max(daily_expense - recurring_daily, 0.0)
+
+    # Cobros por día del horizonte (índice 0 = mañana)
+    charges = np.zeros(horizon_days)
+    first = np.datetime64(today, "D")
+    upcoming = []
+    for item in recurring:
+        dates = charge_dates(item.frequency, item.detected_day, item.last_charged_date, today, horizon_days)
+        np.add.at(charges, (dates - first).astype(int) - 1, item.amount)
+        upcoming.extend(
+            {"date": day, "name": item.name, "amount": item.amount, "frequency": item.frequency}
+            for day in dates.astype(object)
+        )
+    upcoming.sort(key=lambda charge: charge["date"])
+
+    balances = start_balance + np.cumsum(daily_income - daily_spending - charges)
+    days = first + np.arange(1, horizon_days + 1)
+
+    below = np.flatnonzero(balances < low_balance)
+    lowest = int(np.argmin(balances))
+    return {
+        "start_balance": round(start_balance, 2),
+        "daily_income": round(daily_income, 2),
+        "daily_spending": round(daily_spending, 2),
+        "horizon_days": horizon_days,
+        "low_balance_threshold": low_balance,
+        "low_balance_date": days[below[0]].astype(object) if below.size else None,
+        "min_balance": round(float(balances[lowest]), 2),
+        "min_balance_date": days[lowest].astype(object),
+        "upcoming_charges": upcoming,
+        "days": [
+            {"date": day, "balance": round(float(balance), 2), "charges": round(float(charge), 2)}
+            for day, balance, charge in zip(days.astype(object), balances, charges)
+        ],
+    }
@@ -0,0 +1,133 @@
+"""
+Cargador columnar (Apache Arrow) de las tablas de un usuario.
+
+Lee solo columnas con un cursor del servidor en lotes de `batch_size` filas
+y arma RecordBatches de Arrow sin crear objetos del ORM. Las columnas de
+texto repetitivas (categoría, descripción, tipo) van dictionary-encoded.
+Lo usan el snapshot Parquet/Arrow y el análisis (ver recurring.py).
+"""
+import os
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlmodel import Session, select
+
+from app.models.base import BudgetCategory, Debt, SavingGoal, Transaction
+
+BATCH_SIZE = 10_000
+
+TEXT = pa.string()
+CODES = pa.dictionary(pa.int32(), pa.string())
+
+
+class Source(NamedTuple):
+    model: type
+    order_by: str
+    fields: Dict[str, pa.DataType]
+
+
+SOURCES: Dict[str, Source] = {
+    "transactions": Source(Transaction, "date", {
+        "id": pa.int64(),
+        "date": pa.timestamp("us"),
+        "type": CODES,
+        "category": CODES,
+        "description": CODES,
+        "amount": pa.float64(),
+        "debt_id": pa.int64(),
+        "saving_goal_id": pa.int64(),
+    }),
+    "debts": Source(Debt, "id", {
+        "id": pa.int64(),
+        "name": TEXT,
+        "total_amount": pa.float64(),
+        "current_balance": pa.float64(),
+        "interest_rate": pa.float64(),
+        "min_payment": pa.float64(),
+    }),
+    "savings": Source(SavingGoal, "id", {
+        "id": pa.int64(),
+        "name": TEXT,
+        "target_amount": pa.float64(),
+        "current_amount": pa.float64(),
+        "deadline": pa.date32(),
+        "type": CODES,
+    }),
+    "budgets": Source(BudgetCategory, "id", {
+        "id": pa.int64(),
+        "name": TEXT,
+        "limit_amount": pa.float64(),
+        "spent_amount": pa.float64(),
+        "rollover_amount": pa.float64(),
+    }),
+}
+
+
+def source_schema(name: str, columns: Optional[Sequence[str]] = None) -> pa.Schema:
+    fields = SOURCES[name].fields
+    return pa.schema([(column, fields[column]) for column in (columns or fields)])
+
+
+def iter_batches(
+    session: Session,
+    name: str,
+    user_id: int,
+    columns: Optional[Sequence[str]] = None,
+    filters: Iterable = (),
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """RecordBatches de la tabla `name` del usuario (solo las columnas pedidas)."""
+    source = SOURCES[name]
+    schema = source_schema(name, columns)
+    model = source.model
+    statement = (
+        select(*[getattr(model, column) for column in schema.names])
+        .where(model.user_id == user_id)
+        .where(*filters)
+        .order_by(getattr(model, source.order_by), model.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for rows in session.execute(statement).partitions(batch_size):
+        values = list(zip(*rows))
+        yield pa.record_batch(
+            [pa.array(values[index], type=field.type) for index, field in enumerate(schema)],
+            schema=schema,
+        )
+
+
+def load_columns(
+    session: Session,
+    name: str,
+    user_id: int,
+    columns: Optional[Sequence[str]] = None,
+    filters: Iterable = (),
+) -> pa.Table:
+    """Tabla completa en memoria (Arrow) para el análisis, sin objetos del ORM."""
+    schema = source_schema(name, columns)
+    return pa.Table.from_batches(list(iter_batches(session, name, user_id, columns, filters)), schema=schema)
+
+
+def write_source(session: Session, name: str, user_id: int, sink, file_format: str = "parquet") -> int:
+    """Escribe la tabla `name` en `sink` (ruta o archivo) lote a lote; devuelve las filas."""
+    schema = source_schema(name)
+    rows = 0
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    with writer:
+        for batch in iter_batches(session, name, user_id):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def write_snapshot(session: Session, user_id: int, directory: str, file_format: str = "parquet") -> Dict[str, int]:
+    """Snapshot de todas las tablas del usuario en `directory` (un archivo por tabla)."""
+    os.makedirs(directory, exist_ok=True)
+    extension = "parquet" if file_format == "parquet" else "arrows"
+    return {
+        name: write_source(session, name, user_id, os.path.join(directory, f"{name}.{extension}"), file_format)
+        for name in SOURCES
+    }
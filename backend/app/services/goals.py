@@ -0,0 +1,118 @@
+"""
+Pronóstico de metas de ahorro.
+
+El ritmo de aportes sale de una sola consulta agrupada por meta sobre
+Transaction (aportes = movimientos con saving_goal_id) y con él se proyecta
+la fecha de cumplimiento, si va a tiempo y cuánto hace falta por mes para
+llegar a la fecha límite. El resultado se cachea por usuario junto con la
+versión de su recurso SAVINGS (app/services/versions.py): cualquier aporte o
+cambio en sus metas sube la versión en el mismo commit, así que con varios
+workers ninguno sirve un pronóstico viejo bajo el ETag nuevo.
+"""
+import math
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func
+from sqlmodel import Session, select, col
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.base import SavingGoal, Transaction
+from app.services.versions import SAVINGS, read_versions
+
+LOOKBACK_DAYS = 180
+DAYS_PER_MONTH = 30.4375
+
+forecast_cache = TTLCache(settings.FORECAST_CACHE_SIZE, settings.FORECAST_CACHE_TTL_SECONDS)
+
+
+def _forecast_goal(goal: SavingGoal, recent: float, first: Optional[datetime], today: date) -> dict:
+    remaining = max(goal.target_amount - goal.current_amount, 0.0)
+
+    # Ritmo mensual: aportes de la ventana (o desde el primer aporte, si es más reciente)
+    monthly_rate = 0.0
+    if recent > 0 and first is not None:
+        window_start = max(today - timedelta(days=LOOKBACK_DAYS), first.date())
+        months = max((today - window_start).days / DAYS_PER_MONTH, 1.0)
+        monthly_rate = recent / months
+
+    projected = None
+    if remaining <= 0:
+        projected = today
+    elif monthly_rate > 0:
+        projected = today + timedelta(days=math.ceil(remaining / monthly_rate * DAYS_PER_MONTH))
+
+    months_left = required_monthly = None
+    if goal.deadline is not None:
+        months_left = round((goal.deadline - today).days / DAYS_PER_MONTH, 1)
+        if remaining > 0 and goal.deadline >= today:
+            required_monthly = round(remaining / max(months_left, 1.0), 2)
+
+    if remaining <= 0:
+        status = "completed"
+    elif goal.deadline is not None and goal.deadline < today:
+        status = "overdue"
+    elif monthly_rate <= 0:
+        status = "no_contributions"
+    elif goal.deadline is None:
+        status = "no_deadline"
+    else:
+        status = "on_track" if projected <= goal.deadline else "behind"
+
+    return {
+        "goal_id": goal.id,
+        "name": goal.name,
+        "target_amount": goal.target_amount,
+        "current_amount": round(goal.current_amount, 2),
+        "remaining": round(remaining, 2),
+        "progress": round(min(goal.current_amount / goal.target_amount, 1.0), 4) if goal.target_amount > 0 else 1.0,
+        "monthly_rate": round(monthly_rate, 2),
+        "projected_completion": projected,
+        "deadline": goal.deadline,
+        "months_left": months_left,
+        "required_monthly": required_monthly,
+        "status": status,
+    }
+
+
+def forecast_goals(session: Session, user_id: int, today: Optional[date] = None) -> List[dict]:
+    """Pronóstico de todas las metas del usuario (cacheado por usuario, día y versión)."""
+    today = today or datetime.utcnow().date()
+    # La versión se lee antes que las metas: lo que se calcule es al menos así de nuevo
+    version = read_versions(session, user_id, [SAVINGS])[SAVINGS]
+    # Las entradas de versiones viejas ya no se piden y caducan por TTL
+    key = (user_id, version)
+    cached = forecast_cache.get(key)
+    if cached is not None and cached[0] == today:
+        return cached[1]
+
+    goals = session.exec(
+        select(SavingGoal).where(SavingGoal.user_id == user_id).order_by(SavingGoal.id)
+    ).all()
+
+    # Una consulta agrupada: aportes recientes y primer aporte por meta
+    since = datetime.combine(today - timedelta(days=LOOKBACK_DAYS), datetime.min.time())
+    contributions: Dict[int, tuple] = {
+        goal_id: (recent or 0.0, first)
+        for goal_id, recent, first in session.exec(
+            select(
+                Transaction.saving_goal_id,
+                func.sum(case((Transaction.date >= since, Transaction.amount), else_=0.0)),
+                func.min(Transaction.date),
+            )
+            .where(Transaction.user_id == user_id)
+            .where(col(Transaction.saving_goal_id).is_not(None))
+            .group_by(Transaction.saving_goal_id)
+        )
+    }
+
+    forecasts = []
+    for goal in goals:
+        recent, first = contributions.get(goal.id, (0.0, None))
+        if isinstance(first, str): # SQLite devuelve MIN(fecha) como texto
+            first = datetime.fromisoformat(first)
+        forecasts.append(_forecast_goal(goal, recent, first, today))
+
+    forecast_cache.set(key, (today, forecasts))
+    return forecasts
@@ -0,0 +1,133 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.recurring import run_recurring_scan
+
+ACTIVE = ("queued", "running")
+
+
+@dataclass
+class ScanJob:
+    id: str
+    user_id: int
+    full: bool = False
+    status: str = "queued" # queued | running | done | failed
+    progress: float = 0.0
+    result: Optional[List[dict]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    # Se resuelve al terminar; los escaneos en línea lo esperan (asyncio.wrap_future)
+    done: Future = field(default_factory=Future, repr=False)
+
+
+def scan_user(user_id: int, full: bool = False, progress=None) -> List[dict]:
+    """Escanea un usuario con su propia sesión (para hilos del pool y la CLI)."""
+    with Session(engine) as session:
+        found = run_recurring_scan(session, user_id, full=full, progress=progress)
+        return [expense.model_dump(mode="json") for expense in found]
+
+
+class ScanJobPool:
+    """
+    Pool acotado de hilos para los escaneos (en segundo plano y en línea).
+    Si ya hay un escaneo en cola o corriendo para el usuario, se reutiliza
+    (las peticiones concurrentes comparten el mismo job): nunca corren dos
+    escaneos del mismo usuario a la vez. Un escaneo completo pedido mientras
+    corre uno incremental queda como siguiente (uno por usuario) y arranca
+    en cuanto termina el actual.
+    """
+
+    def __init__(self, max_workers: int, ttl_seconds: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan")
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ScanJob] = {}
+        self._active_by_user: Dict[int, ScanJob] = {}
+        self._followups: Dict[int, ScanJob] = {}
+
+    def submit(self, user_id: int, full: bool = False) -> ScanJob:
+        with self._lock:
+            self._prune()
+            job = self._active_by_user.get(user_id)
+            if job is not None:
+                if not full or job.full:
+                    return job
+                # Un escaneo completo pedido mientras otro espera en cola lo "ascendemos"
+                if job.status == "queued":
+                    job.full = True
+                    return job
+                # Ya corre uno incremental: el completo espera a que termine
+                follow = self._followups.get(user_id)
+                if follow is None:
+                    follow = ScanJob(id=uuid.uuid4().hex, user_id=user_id, full=True)
+                    self._jobs[follow.id] = follow
+                    self._followups[user_id] = follow
+                return follow
+
+            job = ScanJob(id=uuid.uuid4().hex, user_id=user_id, full=full)
+            self._jobs[job.id] = job
+            self._active_by_user[user_id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: ScanJob) -> None:
+        # Bajo el lock: `submit` solo asciende a completo un job que sigue en cola
+        with self._lock:
+            job.status = "running"
+            full = job.full
+
+        def report(fraction: float) -> None:
+            job.progress = round(fraction, 2)
+
+        failure = None
+        try:
+            job.result = scan_user(job.user_id, full=full, progress=report)
+            job.status = "done"
+            job.progress = 1.0
+        except Exception as exc:
+            failure = exc
+            job.status = "failed"
+            job.error = str(exc)
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active_by_user.get(job.user_id) is job:
+                    del self._active_by_user[job.user_id]
+                follow = self._followups.pop(job.user_id, None)
+                if follow is not None:
+                    self._active_by_user[job.user_id] = follow
+            if follow is not None:
+                self._executor.submit(self._run, follow)
+
+        # Después de sacarlo de los activos: quien despierte y vuelva a pedir
+        # un escaneo obtiene un job nuevo y no este ya terminado
+        if failure is None:
+            job.done.set_result(job.result)
+        else:
+            job.done.set_exception(failure)
+
+    def _prune(self) -> None:
+        """Olvida los jobs terminados hace más de `ttl` segundos."""
+        limit = time.time() - self._ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < limit
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+scan_pool = ScanJobPool(settings.SCAN_WORKERS, settings.SCAN_JOB_TTL_SECONDS)
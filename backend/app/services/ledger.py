@@ -0,0 +1,178 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, case, func, or_, update
+from sqlmodel import Session, select, col
+
+from app.models.base import BudgetCategory, Debt, PeriodClose, SavingGoal, Transaction
+from app.services.periods import BUDGET_CLOSE
+from app.services.versions import BUDGET, mark_changed
+
+
+def load_targets(session: Session, user_id: int) -> Tuple[Dict[str, int], Set[int], Set[int]]:
+    """
+    Precarga (una consulta por tabla) lo que un lote de movimientos puede tocar:
+    categorías por nombre, ids de deudas e ids de metas del usuario.
+    """
+    categories = {
+        name: category_id
+        for category_id, name in session.exec(
+            select(BudgetCategory.id, BudgetCategory.name).where(BudgetCategory.user_id == user_id)
+        )
+    }
+    debt_ids = set(session.exec(select(Debt.id).where(Debt.user_id == user_id)))
+    goal_ids = set(session.exec(select(SavingGoal.id).where(SavingGoal.user_id == user_id)))
+    return categories, debt_ids, goal_ids
+
+
+def apply_adjustments(
+    session: Session,
+    category_deltas: Dict[int, float],
+    debt_deltas: Dict[int, float],
+    goal_deltas: Dict[int, float],
+) -> None:
+    """
+    Aplica los ajustes agrupados por fila con UPDATEs atómicos (col = col + delta),
+    uno por tabla en modo executemany.
+    La deuda se sigue recortando a 0 como en el alta individual.
+    """
+    connection = session.connection()
+
+    if category_deltas:
+        connection.execute(
+            update(BudgetCategory)
+            .where(BudgetCategory.id == bindparam("row_id"))
+            .values(spent_amount=BudgetCategory.spent_amount + bindparam("delta")),
+            [{"row_id": row_id, "delta": delta} for row_id, delta in category_deltas.items()],
+        )
+
+    if debt_deltas:
+        remaining = Debt.current_balance - bindparam("delta")
+        connection.execute(
+            update(Debt)
+            .where(Debt.id == bindparam("row_id"))
+            .values(current_balance=case((remaining < 0, 0.0), else_=remaining)),
+            [{"row_id": row_id, "delta": delta} for row_id, delta in debt_deltas.items()],
+        )
+
+    if goal_deltas:
+        connection.execute(
+            update(SavingGoal)
+            .where(SavingGoal.id == bindparam("row_id"))
+            .values(current_amount=SavingGoal.current_amount + bindparam("delta")),
+            [{"row_id": row_id, "delta": delta} for row_id, delta in goal_deltas.items()],
+        )
+
+
+def adjust_for_transaction(
+    session: Session,
+    user_id: int,
+    tx_type: str,
+    amount: float,
+    category: Optional[str],
+    debt_id: Optional[int],
+    saving_goal_id: Optional[int],
+) -> None:
+    """
+    Ajustes de un solo movimiento sin leer las filas: cada contador se mueve con
+    un UPDATE atómico filtrado por usuario, así dos altas concurrentes sobre la
+    misma categoría/deuda/meta no se pisan. Si la fila no existe (o es de otro
+    usuario) el UPDATE simplemente no toca nada, igual que antes.
+    """
+    if tx_type == "expense" and category:
+        session.execute(
+            update(BudgetCategory)
+            .where(BudgetCategory.user_id == user_id)
+            .where(BudgetCategory.name == category)
+            .values(spent_amount=BudgetCategory.spent_amount + amount)
+        )
+
+    if debt_id:
+        remaining = Debt.current_balance - amount
+        session.execute(
+            update(Debt)
+            .where(Debt.id == debt_id)
+            .where(Debt.user_id == user_id)
+            .values(current_balance=case((remaining < 0, 0.0), else_=remaining))
+        )
+
+    if saving_goal_id:
+        session.execute(
+            update(SavingGoal)
+            .where(SavingGoal.id == saving_goal_id)
+            .where(SavingGoal.user_id == user_id)
+            .values(current_amount=SavingGoal.current_amount + amount)
+        )
+
+
+def reconcile_budgets(
+    session: Session,
+    since: Optional[date] = None,
+    user_id: Optional[int] = None,
+    dry_run: bool = False,
+) -> List[dict]:
+    """
+    Recalcula `BudgetCategory.spent_amount` desde Transaction: gastos de la
+    categoría desde el inicio del periodo abierto del presupuesto de cada
+    usuario, o sea su último cierre de mes (PeriodClose "budget"); sin cierre,
+    todo el historial (el gasto nunca se reinició). `since` fuerza la misma
+    fecha para todos. Devuelve la deriva por categoría; sin dry_run la
+    corrige en un executemany.
+
+    Las metas y deudas no se reconcilian aquí: arrancan de un saldo que captura
+    el usuario y las deudas suman intereses que no pasan por Transaction.
+    """
+    spent = (
+        select(Transaction.user_id, Transaction.category, func.sum(Transaction.amount))
+        .where(Transaction.type == "expense")
+        .where(col(Transaction.category).is_not(None))
+        .group_by(Transaction.user_id, Transaction.category)
+    )
+    last_close = (
+        select(PeriodClose.user_id, func.max(PeriodClose.closed_at).label("closed_at"))
+        .where(PeriodClose.kind == BUDGET_CLOSE)
+        .group_by(PeriodClose.user_id)
+    )
+    categories = select(BudgetCategory)
+    if user_id is not None:
+        spent = spent.where(Transaction.user_id == user_id)
+        last_close = last_close.where(PeriodClose.user_id == user_id)
+        categories = categories.where(BudgetCategory.user_id == user_id)
+
+    # Inicio del periodo por usuario (sin cierre = desde siempre)
+    override = datetime.combine(since, datetime.min.time()) if since else None
+    starts: Dict[int, datetime] = {}
+    if override:
+        spent = spent.where(Transaction.date >= override)
+    else:
+        closes = last_close.subquery()
+        spent = spent.outerjoin(closes, closes.c.user_id == Transaction.user_id).where(or_(
+            closes.c.closed_at.is_(None), Transaction.date >= closes.c.closed_at
+        ))
+        starts = dict(session.exec(last_close).all())
+
+    expected = {(uid, name): total for uid, name, total in session.exec(spent)}
+
+    drift = []
+    for category in session.exec(categories):
+        total = expected.get((category.user_id, category.name), 0.0)
+        if abs(category.spent_amount - total) > 0.005:
+            drift.append({
+                "category_id": category.id,
+                "user_id": category.user_id,
+                "name": category.name,
+                "stored_spent": round(category.spent_amount, 2),
+                "expected_spent": round(total, 2),
+                "period_start": override or starts.get(category.user_id),
+            })
+
+    if drift and not dry_run:
+        session.connection().execute(
+            update(BudgetCategory)
+            .where(BudgetCategory.id == bindparam("row_id"))
+            .values(spent_amount=bindparam("spent")),
+            [{"row_id": item["category_id"], "spent": item["expected_spent"]} for item in drift],
+        )
+        mark_changed(session, {item["user_id"] for item in drift}, BUDGET)
+        session.commit()
+    return drift
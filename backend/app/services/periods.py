@@ -0,0 +1,87 @@
+"""
+Cierre de mes del presupuesto y devengo de intereses, set-based.
+
+Cada operación es un solo UPDATE para todos los usuarios del bloque. La
+idempotencia la da PeriodClose: antes del UPDATE se inserta (user, tipo,
+periodo) y solo se actualizan los usuarios que no tenían ese cierre, todo en
+la misma transacción. Si otro proceso cerró el mismo bloque a la vez, la PK
+compuesta hace fallar el INSERT y el bloque entero se revierte.
+"""
+from datetime import date, datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, insert, update
+from sqlmodel import Session, select, col
+
+from app.models.base import BudgetCategory, Debt, PeriodClose
+from app.services.versions import BUDGET, DEBTS, mark_changed
+
+BUDGET_CLOSE = "budget"
+INTEREST_ACCRUAL = "interest"
+
+
+def period_label(day: Optional[date] = None) -> str:
+    """Periodo "AAAA-MM" (por defecto el mes en curso)."""
+    return (day or datetime.utcnow().date()).strftime("%Y-%m")
+
+
+def claim_period(session: Session, kind: str, period: str, user_ids: Sequence[int]) -> List[int]:
+    """Registra el cierre para los usuarios que aún no lo tenían y los devuelve."""
+    done = set(session.exec(
+        select(PeriodClose.user_id)
+        .where(PeriodClose.kind == kind)
+        .where(PeriodClose.period == period)
+        .where(col(PeriodClose.user_id).in_(user_ids))
+    ))
+    pending = [user_id for user_id in user_ids if user_id not in done]
+    if pending:
+        now = datetime.utcnow()
+        session.execute(insert(PeriodClose), [
+            {"user_id": user_id, "kind": kind, "period": period, "closed_at": now}
+            for user_id in pending
+        ])
+    return pending
+
+
+def close_budget_month(session: Session, user_ids: Sequence[int], period: str) -> Tuple[List[int], int]:
+    """
+    Rollover: lo que sobró (límite + rollover - gastado, nunca negativo) pasa
+    al rollover y el gasto vuelve a 0. Devuelve (usuarios cerrados, categorías).
+    No hace commit.
+    """
+    claimed = claim_period(session, BUDGET_CLOSE, period, user_ids)
+    if not claimed:
+        return claimed, 0
+
+    # En el SET ambas columnas leen los valores previos a la actualización
+    remaining = BudgetCategory.limit_amount + BudgetCategory.rollover_amount - BudgetCategory.spent_amount
+    result = session.execute(
+        update(BudgetCategory)
+        .where(col(BudgetCategory.user_id).in_(claimed))
+        .values(
+            rollover_amount=case((remaining > 0, remaining), else_=0.0),
+            spent_amount=0.0,
+        )
+    )
+    mark_changed(session, claimed, BUDGET)
+    return claimed, result.rowcount
+
+
+def accrue_interest(session: Session, user_ids: Sequence[int], period: str) -> Tuple[List[int], int]:
+    """
+    Interés mensual: saldo * (tasa anual / 12) / 100 sobre las deudas con saldo
+    y tasa positivos. Devuelve (usuarios cerrados, deudas). No hace commit.
+    """
+    claimed = claim_period(session, INTEREST_ACCRUAL, period, user_ids)
+    if not claimed:
+        return claimed, 0
+
+    result = session.execute(
+        update(Debt)
+        .where(col(Debt.user_id).in_(claimed))
+        .where(Debt.current_balance > 0)
+        .where(Debt.interest_rate > 0)
+        .values(current_balance=Debt.current_balance + Debt.current_balance * (Debt.interest_rate / 12) / 100)
+    )
+    mark_changed(session, claimed, DEBTS)
+    return claimed, result.rowcount
@@ -0,0 +1,113 @@
+"""
+Motor vectorizado de detección de recurrencias.
+
+Trabaja sobre arreglos columnares de un usuario (código de grupo, día, monto)
+y evalúa todas las cadencias a la vez con NumPy, sin objetos por movimiento.
+
+Para cada grupo y cadencia de período P se ubica cada cobro en una grilla
+anclada al primer cobro: slot = round((t - t0) / P). De ahí salen:
+- regularidad: qué tan cerca de su slot cae cada cobro (cobros tardíos),
+- cobertura: slots ocupados / slots esperados (cobros que faltaron),
+- duplicados: cobros que comparten slot (no es una suscripción).
+La confianza combina esas medidas con la dispersión de los montos.
+"""
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+# Nombre, período en días y tolerancia (días) para considerar un cobro "a tiempo"
+CADENCES = (
+    ("weekly", 7.0, 1.5),
+    ("biweekly", 14.0, 2.5),
+    ("monthly", 30.4375, 4.0),
+    ("quarterly", 91.3125, 8.0),
+    ("annual", 365.25, 15.0),
+)
+PERIODS = np.array([c[1] for c in CADENCES])
+TOLERANCES = np.array([c[2] for c in CADENCES])
+
+MIN_OCCURRENCES = 3
+MIN_CONFIDENCE = 0.5
+
+
+@dataclass
+class Recurrence:
+    code: int # Código del grupo (descripción normalizada) del que llama
+    frequency: str
+    confidence: float
+    amount: float
+    last_index: int # Índice (en los arreglos de entrada) del último cobro
+
+
+def detect_recurrences(codes: np.ndarray, days: np.ndarray, amounts: np.ndarray) -> List[Recurrence]:
+    """
+    codes: código entero del grupo de cada movimiento.
+    days: fecha del movimiento en días (float, cualquier origen).
+    amounts: monto de cada movimiento.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    days = np.asarray(days, dtype=np.float64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    if codes.size == 0:
+        return []
+
+    # 1. Orden por (grupo, fecha) y límites de cada grupo
+    order = np.lexsort((days, codes))
+    codes, days, amounts = codes[order], days[order], amounts[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], codes.size] - 1
+    sizes = ends - starts + 1
+    group_of = np.repeat(np.arange(starts.size), sizes)
+
+    # 2. Grilla por cadencia: (N movimientos x C cadencias)
+    rel = days - days[starts][group_of]
+    slots = np.rint(rel[:, None] / PERIODS[None, :])
+    residual = rel[:, None] - slots * PERIODS[None, :]
+
+    # Fase típica del grupo (cobro sistemáticamente "tarde") y desvío de cada cobro
+    phase = np.add.reduceat(residual, starts, axis=0) / sizes[:, None]
+    deviation = np.abs(residual - phase[group_of])
+    on_time = deviation <= TOLERANCES[None, :]
+    regularity = np.add.reduceat(on_time, starts, axis=0) / sizes[:, None]
+    mean_deviation = np.add.reduceat(deviation, starts, axis=0) / sizes[:, None]
+    timing = 1.0 - 0.5 * np.clip(mean_deviation / TOLERANCES[None, :], 0.0, 1.0)
+
+    # Slots ocupados: los slots son no decrecientes dentro de cada grupo
+    new_slot = np.ones_like(slots, dtype=bool)
+    new_slot[1:] = (slots[1:] > slots[:-1]) | (group_of[1:] != group_of[:-1])[:, None]
+    occupied = np.add.reduceat(new_slot, starts, axis=0)
+    expected = slots[ends] + 1
+    coverage = occupied / expected
+    uniqueness = occupied / sizes[:, None]
+
+    # 3. Dispersión de montos (coeficiente de variación)
+    amount_sum = np.add.reduceat(amounts, starts)
+    amount_sq = np.add.reduceat(amounts * amounts, starts)
+    mean_amount = amount_sum / sizes
+    variance = np.maximum(amount_sq / sizes - mean_amount ** 2, 0.0)
+    cv = np.sqrt(variance) / np.maximum(np.abs(mean_amount), 1e-9)
+    amount_score = 1.0 / (1.0 + 2.0 * cv)
+
+    # 4. Confianza por cadencia y elección de la mejor
+    sample = 1.0 - 0.5 / np.maximum(occupied, 1)
+    confidence = (
+        regularity * timing * coverage * uniqueness * sample * amount_score[:, None]
+    )
+    confidence[occupied < MIN_OCCURRENCES] = 0.0
+    best = np.argmax(confidence, axis=1)
+    best_confidence = confidence[np.arange(starts.size), best]
+
+    detected = np.flatnonzero(
+        (sizes >= MIN_OCCURRENCES) & (best_confidence >= MIN_CONFIDENCE)
+    )
+    return [
+        Recurrence(
+            code=int(codes[starts[g]]),
+            frequency=CADENCES[best[g]][0],
+            confidence=round(float(best_confidence[g]), 2),
+            amount=round(float(mean_amount[g]), 2),
+            last_index=int(order[ends[g]]),
+        )
+        for g in detected
+    ]
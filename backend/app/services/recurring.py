@@ -0,0 +1,339 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func
+from sqlmodel import Session, select, col
+
+from app.core.config import settings
+from app.models.base import (
+    Transaction, RecurringExpense, RecurringScanState, RecurringGroupState
+)
+from app.services.columnar import load_columns
+from app.services.recurrence_engine import CADENCES, MIN_CONFIDENCE, MIN_OCCURRENCES, detect_recurrences
+
+NAME_CHUNK = 500
+
+Row = Tuple[datetime, float]
+
+
+def normalize_name(description: str) -> str:
+    """"Spotify " -> "spotify" """
+    return description.strip().lower()
+
+
+def _fold(group: RecurringGroupState, tx_date: datetime, amount: float) -> None:
+    """Suma un movimiento (en orden de fecha) a las estadísticas del grupo."""
+    if group.count:
+        gap = (tx_date - group.last_date).days
+        group.max_gap_days = gap if group.max_gap_days is None else max(group.max_gap_days, gap)
+    else:
+        group.first_date = tx_date
+    group.last_date = tx_date
+    group.count += 1
+    group.amount_sum += amount
+    group.amount_sq_sum += amount * amount
+
+
+def _new_group(user_id: int, name: str, rows: List[Row]) -> RecurringGroupState:
+    group = RecurringGroupState(
+        user_id=user_id, name=name, first_date=rows[0][0], last_date=rows[0][0]
+    )
+    _refold(group, rows)
+    return group
+
+
+def _refold(group: RecurringGroupState, rows: List[Row]) -> None:
+    """Recalcula el grupo desde cero con su historial ordenado por fecha."""
+    group.count = 0
+    group.amount_sum = group.amount_sq_sum = 0.0
+    group.max_gap_days = None
+    for tx_date, amount in rows:
+        _fold(group, tx_date, amount)
+
+
+def _may_recur(group: RecurringGroupState) -> bool:
+    """
+    Cota superior de la confianza del motor (recurrence_engine.py) con solo
+    las estadísticas del grupo. Si ni en el mejor caso llega a MIN_CONFIDENCE,
+    no cargamos su historial (p. ej. el súper: miles de compras irregulares).
+    - Montos: amount_score = 1 / (1 + 2·cv) es uno de los factores.
+    - Fechas: con período P hay round(span / P) + 1 slots esperados; los
+      ocupados no pasan de `count` ni de los esperados menos los que deja
+      vacíos el hueco más largo (≥ hueco / P - 2). Cobertura × unicidad =
+      ocupados² / (esperados × count).
+    Los demás factores (regularidad, puntualidad) valen a lo más 1.
+    """
+    if group.count < MIN_OCCURRENCES:
+        return False
+
+    mean = group.amount_sum / group.count
+    variance = max(group.amount_sq_sum / group.count - mean * mean, 0.0)
+    cv = math.sqrt(variance) / max(abs(mean), 1e-9)
+    amount_score = 1.0 / (1.0 + 2.0 * cv)
+
+    span = (group.last_date - group.first_date).total_seconds() / 86400.0
+    for _, period, _ in CADENCES:
+        expected = round(span / period) + 1
+        empty = max(0, math.ceil((group.max_gap_days or 0) / period - 2))
+        occupied = min(group.count, expected - empty)
+        if occupied < MIN_OCCURRENCES:
+            continue
+        sample = 1.0 - 0.5 / occupied
+        bound = occupied * occupied / (expected * group.count) * sample * amount_score
+        if bound >= MIN_CONFIDENCE - 1e-9:
+            return True
+    return False
+
+
+def _chunks(items: Iterable[str]) -> Iterable[List[str]]:
+    items = list(items)
+    for start in range(0, len(items), NAME_CHUNK):
+        yield items[start:start + NAME_CHUNK]
+
+
+def new_rows_statement(user_id: int, after_id: int):
+    """
+    Movimientos posteriores a la marca de agua. Se ordenan por id para que
+    ix_transaction_user_id entregue el orden; el orden por fecha se hace en
+    Python (sobre ids casi cronológicos es casi gratis). La usa también
+    app/db/query_plans.py, así que el EXPLAIN revisa esta misma consulta.
+    """
+    return (
+        select(Transaction.id, Transaction.description, Transaction.date, Transaction.amount)
+        .where(Transaction.user_id == user_id)
+        .where(col(Transaction.id) > after_id)
+        .order_by(Transaction.id)
+    )
+
+
+def _check_late_rows(session: Session, state: RecurringScanState, user_id: int) -> List:
+    """
+    La marca de agua avanza al id más alto leído, pero en Postgres una
+    transacción más lenta (p. ej. una carga masiva) puede tener ids más bajos
+    y confirmar después: esas filas quedarían siempre debajo de la marca.
+
+    Cada escaneo guarda un punto de control: el id máximo global y la hora.
+    Pasado SCAN_WATERMARK_LAG_SECONDS, todo id <= ese ya confirmó (o se
+    descartó), así que contamos las filas del usuario en ese rango y las
+    comparamos con las que procesamos. Si faltó alguna, devolvemos las filas
+    del rango para recalcular sus grupos desde el historial.
+    """
+    upper = min(state.checkpoint_id, state.last_transaction_id)
+    in_range = (
+        Transaction.user_id == user_id,
+        col(Transaction.id) > state.safe_transaction_id,
+        col(Transaction.id) <= upper,
+    )
+    actual = session.exec(select(func.count()).select_from(Transaction).where(*in_range)).one()
+    if actual == state.checkpoint_count:
+        return []
+    return session.exec(
+        select(Transaction.id, Transaction.description, Transaction.date, Transaction.amount).where(*in_range)
+    ).all()
+
+
+def _advance_checkpoint(session: Session, state: RecurringScanState, new_rows: List, verified: bool) -> None:
+    """Cuenta las filas procesadas y, si el punto de control se verificó (o no hay), abre uno nuevo."""
+    for row in new_rows:
+        if row.id <= state.checkpoint_id:
+            state.checkpoint_count += 1
+        else:
+            state.processed_after_checkpoint += 1
+    if new_rows:
+        state.last_transaction_id = max(row.id for row in new_rows)
+
+    if verified or state.checkpoint_at is None:
+        if verified:
+            state.safe_transaction_id = max(state.safe_transaction_id, state.checkpoint_id)
+        # Leído después de las filas: todo lo procesado queda <= checkpoint_id
+        state.checkpoint_id = session.exec(select(func.max(Transaction.id))).one() or 0
+        state.checkpoint_count = state.processed_after_checkpoint
+        state.processed_after_checkpoint = 0
+        state.checkpoint_at = datetime.utcnow()
+
+
+def _load_history(session: Session, user_id: int, names: Set[str]) -> Dict[str, List[Row]]:
+    """
+    Historial completo de los grupos indicados con el cargador columnar (Arrow):
+    la descripción viene dictionary-encoded, así que se normaliza una vez por
+    valor distinto y no por fila.
+    """
+    history: Dict[str, List[Row]] = defaultdict(list)
+    normalized = func.lower(func.trim(Transaction.description))
+    for chunk in _chunks(names):
+        table = load_columns(
+            session, "transactions", user_id,
+            columns=("description", "date", "amount"),
+            filters=[normalized.in_(chunk)],
+        )
+        if not table.num_rows:
+            continue
+        descriptions = table.column("description").combine_chunks()
+        group_names = [normalize_name(value) for value in descriptions.dictionary.to_pylist()]
+        for code, tx_date, amount in zip(
+            descriptions.indices.to_pylist(),
+            table.column("date").to_pylist(),
+            table.column("amount").to_pylist(),
+        ):
+            name = group_names[code]
+            if name in names:
+                history[name].append((tx_date, amount))
+    return history
+
+
+def _to_columns(history: Dict[str, List[Row]]):
+    """Historial por grupo -> arreglos (códigos, días, montos) para el motor."""
+    names = list(history)
+    sizes = [len(history[name]) for name in names]
+    codes = np.repeat(np.arange(len(names)), sizes)
+    dates = [tx_date for name in names for tx_date, _ in history[name]]
+    amounts = np.fromiter(
+        (amount for name in names for _, amount in history[name]), dtype=np.float64, count=len(dates)
+    )
+    days = np.array(dates, dtype="datetime64[s]").astype(np.float64) / 86400.0
+    return names, dates, codes, days, amounts
+
+
+def run_recurring_scan(
+    session: Session,
+    user_id: int,
+    full: bool = False,
+    progress: Optional[Callable[[float], None]] = None,
+) -> List[RecurringExpense]:
+    """
+    🧠 CEREBRO DEL DETECTIVE FINANCIERO (incremental):
+    1. Lee solo los movimientos posteriores a la marca de agua del usuario.
+    2. Los agrega al estado de su grupo (descripción normalizada).
+    3. Si llegan movimientos con fecha anterior al último visto, o que
+       confirmaron tarde con un id bajo la marca (_check_late_rows), ese grupo
+       se recalcula con su historial.
+    4. Pasa el historial columnar de los grupos candidatos al motor
+       vectorizado (semanal, quincenal, mensual, trimestral, anual) y guarda
+       en RecurringExpense las recurrencias todavía no detectadas.
+
+    `full=True` borra el estado y recorre todo el historial (backfill).
+    `progress` recibe el avance (0..1) para los escaneos en segundo plano.
+    """
+    report = progress or (lambda fraction: None)
+    state = session.get(RecurringScanState, user_id)
+    if state is None:
+        state = RecurringScanState(user_id=user_id)
+    if full:
+        session.execute(delete(RecurringGroupState).where(RecurringGroupState.user_id == user_id))
+        state.last_transaction_id = state.safe_transaction_id = 0
+        state.checkpoint_id = state.checkpoint_count = state.processed_after_checkpoint = 0
+        state.checkpoint_at = None
+
+    # ¿Ya pasó el margen desde el último punto de control? (se decide antes de leer)
+    started = datetime.utcnow()
+    verified = (
+        state.checkpoint_at is not None
+        and started - state.checkpoint_at >= timedelta(seconds=settings.SCAN_WATERMARK_LAG_SECONDS)
+    )
+
+    new_rows = session.exec(new_rows_statement(user_id, state.last_transaction_id)).all()
+    late_rows = _check_late_rows(session, state, user_id) if verified else []
+
+    report(0.25)
+
+    state.scanned_at = started
+    if not new_rows and not late_rows:
+        _advance_checkpoint(session, state, new_rows, verified)
+        session.add(state)
+        session.commit()
+        return []
+
+    incoming: Dict[str, List[Row]] = defaultdict(list)
+    # Los grupos se pliegan en orden cronológico
+    for _, description, tx_date, amount in sorted(new_rows + late_rows, key=lambda row: (row.date, row.id)):
+        incoming[normalize_name(description)].append((tx_date, amount))
+    late_names = {normalize_name(row.description) for row in late_rows}
+
+    # Estado previo de los grupos tocados (por lotes de nombres)
+    groups: Dict[str, RecurringGroupState] = {}
+    if not full:
+        for chunk in _chunks(incoming):
+            for group in session.exec(
+                select(RecurringGroupState)
+                .where(RecurringGroupState.user_id == user_id)
+                .where(col(RecurringGroupState.name).in_(chunk))
+            ):
+                groups[group.name] = group
+
+    stale: Set[str] = set()
+    for name, rows in incoming.items():
+        group = groups.get(name)
+        if group is None:
+            groups[name] = _new_group(user_id, name, rows)
+        elif rows[0][0] < group.last_date or name in late_names:
+            stale.add(name) # Llegó un movimiento "del pasado" o tardío: recalculamos el grupo
+        else:
+            for tx_date, amount in rows:
+                _fold(group, tx_date, amount)
+
+    # Detecciones existentes: una sola consulta
+    existing = {
+        normalize_name(name)
+        for name in session.exec(
+            select(RecurringExpense.name).where(RecurringExpense.user_id == user_id)
+        )
+    }
+
+    # Candidatos: grupos tocados, aún no detectados y que podrían ser periódicos
+    # según sus estadísticas. Los grupos a recalcular todavía no sumaron sus
+    # movimientos nuevos: esos se cargan siempre y se filtran tras recalcularlos.
+    candidates = set()
+    for name in incoming:
+        if name in existing:
+            continue
+        if name in stale or _may_recur(groups[name]):
+            candidates.add(name)
+
+    # Historial columnar de candidatos y grupos a recalcular (en full ya lo tenemos)
+    if full:
+        history = incoming
+    else:
+        history = _load_history(session, user_id, candidates | stale)
+    report(0.6)
+    for name in stale:
+        if name in history:
+            _refold(groups[name], history[name])
+            if name in candidates and not _may_recur(groups[name]):
+                candidates.discard(name)
+    for name in incoming:
+        session.add(groups[name])
+
+    detected_expenses = []
+    candidate_history = {name: history[name] for name in candidates if name in history}
+    if candidate_history:
+        names, dates, codes, days, amounts = _to_columns(candidate_history)
+        for found in detect_recurrences(codes, days, amounts):
+            last_date = dates[found.last_index]
+
+            # 💡 ¡EUREKA! Nuevo gasto silencioso encontrado
+            new_recurrence = RecurringExpense(
+                user_id=user_id,
+                name=names[found.code].title(), # Lo ponemos bonito "spotify" -> "Spotify"
+                amount=found.amount,
+                frequency=found.frequency,
+                detected_day=last_date.day, # Usamos el día del último cobro
+                confidence_score=found.confidence,
+                is_confirmed=False, # El usuario debe aprobarlo
+                last_charged_date=last_date.date(),
+            )
+            session.add(new_recurrence)
+            detected_expenses.append(new_recurrence)
+
+    report(0.9)
+    _advance_checkpoint(session, state, new_rows, verified)
+    session.add(state)
+    session.commit()
+
+    # Refrescamos los objetos para devolverlos con ID real
+    for exp in detected_expenses:
+        session.refresh(exp)
+
+    return detected_expenses
@@ -0,0 +1,117 @@
+"""
+Versión por usuario y recurso para los GET condicionales (ETag / 304).
+
+Cada commit que cambia datos de un usuario sube en la MISMA transacción la
+versión de los recursos tocados. Los cambios hechos con el ORM se detectan
+solos (after_flush); las escrituras con UPDATE/INSERT directos (carga masiva,
+cierre de mes, intereses, reconciliación) llaman a `mark_changed`.
+
+Qué invalida cada escritura:
+- Transaction: transactions; además budget si es gasto, debts si abona a
+  una deuda y savings si aporta a una meta.
+- BudgetCategory / Debt / SavingGoal / RecurringExpense: su propio recurso.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Set, Tuple
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, col
+
+from app.models.base import BudgetCategory, Debt, RecurringExpense, ResourceVersion, SavingGoal, Transaction
+
+TRANSACTIONS = "transactions"
+BUDGET = "budget"
+DEBTS = "debts"
+SAVINGS = "savings"
+RECURRING = "recurring"
+
+MODEL_RESOURCES = {
+    BudgetCategory: BUDGET,
+    Debt: DEBTS,
+    SavingGoal: SAVINGS,
+    RecurringExpense: RECURRING,
+}
+
+
+def transaction_resources(tx_type: str, debt_id=None, saving_goal_id=None) -> Set[str]:
+    """Recursos que cambia un movimiento (ver tabla en el docstring del módulo)."""
+    resources = {TRANSACTIONS}
+    if tx_type == "expense":
+        resources.add(BUDGET)
+    if debt_id:
+        resources.add(DEBTS)
+    if saving_goal_id:
+        resources.add(SAVINGS)
+    return resources
+
+
+def mark_changed(session: Session, user_ids: Iterable[int], *resources: str) -> None:
+    """Marca (usuario, recurso) para subir su versión cuando la sesión haga commit."""
+    changes = session.info.setdefault("changed_resources", set())
+    changes.update((user_id, resource) for user_id in user_ids for resource in resources)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_resources(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Transaction):
+            mark_changed(session, [obj.user_id], *transaction_resources(obj.type, obj.debt_id, obj.saving_goal_id))
+        elif type(obj) in MODEL_RESOURCES:
+            mark_changed(session, [obj.user_id], MODEL_RESOURCES[type(obj)])
+
+@event.listens_for(Session, "before_commit")
+def _bump_changed_resources(session):
+    # Vaciamos lo pendiente para que sus marcas entren en este mismo commit
+    session.flush()
+    changes = session.info.pop("changed_resources", None)
+    if changes:
+        bump_versions(session, changes)
+
+
+def bump_versions(session: Session, changes: Set[Tuple[int, str]]) -> None:
+    """
+    +1 a la versión de cada (usuario, recurso): un UPDATE por recurso para
+    todos sus usuarios y un INSERT para los que aún no tenían fila. Si otra
+    transacción creó alguna de esas filas a la vez, se repite el UPDATE.
+    """
+    by_resource: Dict[str, Set[int]] = defaultdict(set)
+    for user_id, resource in changes:
+        by_resource[resource].add(user_id)
+
+    def increment(resource: str, user_ids: Set[int]) -> int:
+        return session.execute(
+            update(ResourceVersion)
+            .where(ResourceVersion.resource == resource)
+            .where(col(ResourceVersion.user_id).in_(user_ids))
+            .values(version=ResourceVersion.version + 1)
+        ).rowcount
+
+    for resource, user_ids in by_resource.items():
+        if increment(resource, user_ids) == len(user_ids):
+            continue
+
+        existing = set(session.exec(
+            select(ResourceVersion.user_id)
+            .where(ResourceVersion.resource == resource)
+            .where(col(ResourceVersion.user_id).in_(user_ids))
+        ))
+        missing = user_ids - existing
+        try:
+            with session.begin_nested():
+                session.execute(insert(ResourceVersion), [
+                    {"user_id": user_id, "resource": resource, "version": 1} for user_id in missing
+                ])
+        except IntegrityError:
+            increment(resource, missing)
+
+
+def read_versions(session: Session, user_id: int, resources: Iterable[str]) -> Dict[str, int]:
+    """Versión actual de cada recurso (0 si nunca se escribió)."""
+    resources = list(resources)
+    stored = dict(session.exec(
+        select(ResourceVersion.resource, ResourceVersion.version)
+        .where(ResourceVersion.user_id == user_id)
+        .where(col(ResourceVersion.resource).in_(resources))
+    ).all())
+    return {resource: stored.get(resource, 0) for resource in resources}
@@ -0,0 +1,73 @@
+"""
+Benchmark de logins por segundo según el factor de trabajo de bcrypt.
+
+Ejecutar desde backend/:
+
+    python -m benchmarks.bench_bcrypt --rounds 10 11 12 13 --workers 4 --seconds 5
+
+Cada "login" es un verify de bcrypt corriendo en el mismo BoundedExecutor
+que usa la API, alimentado por `--clients` corrutinas concurrentes en un solo
+event loop (igual que las peticiones de la API).
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core.hashing import BoundedExecutor
+
+PASSWORD = "password123"
+
+
+async def bench_rounds(rounds: int, workers: int, queue_limit: int, clients: int, seconds: float) -> dict:
+    context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds)
+    hashed = context.hash(PASSWORD)
+    executor = BoundedExecutor(workers, queue_limit, name=f"bench-{rounds}")
+    deadline = time.perf_counter() + seconds
+    latencies = []
+
+    async def client() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                await executor.run(context.verify, PASSWORD, hashed)
+            except HTTPException:
+                await asyncio.sleep(0.01) # 503: rechazado por back-pressure, reintentamos
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rounds": rounds,
+        "logins_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        "rejected_503": executor.rejected,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-limit", type=int, default=32)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6} {'logins/s':>10} {'p50 ms':>8} {'503s':>6}")
+    for rounds in args.rounds:
+        result = asyncio.run(bench_rounds(rounds, args.workers, args.queue_limit, args.clients, args.seconds))
+        print(
+            f"{result['rounds']:>6} {result['logins_per_second']:>10} "
+            f"{result['p50_ms']:>8} {result['rejected_503']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Throughput del camino síncrono (Session en el threadpool, como los handlers
+`def` de FastAPI) vs. el asíncrono (AsyncSession en el event loop) bajo la
+misma carga: `--clients` clientes concurrentes pidiendo la primera página
+del historial de un usuario con `--rows` movimientos.
+
+Ejecutar desde backend/ (usa DATABASE_URL, crea un usuario de prueba):
+
+    python -m benchmarks.bench_db_modes --clients 50 --requests 2000 --rows 5000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import anyio
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import engine, async_engine
+from app.models.base import Transaction, User
+
+
+def seed_user(rows: int) -> int:
+    with Session(engine) as session:
+        user = User(
+            email=f"bench_{random.randint(0, 10**9)}@bench.local",
+            password_hash="-",
+            full_name="Bench",
+        )
+        session.add(user)
+        session.commit()
+        start = datetime.utcnow() - timedelta(days=rows)
+        session.execute(insert(Transaction), [
+            {
+                "user_id": user.id,
+                "amount": round(random.uniform(1, 200), 2),
+                "type": random.choice(["income", "expense"]),
+                "category": random.choice(["Comida", "Transporte", "Hogar"]),
+                "description": random.choice(["Oxxo", "Uber", "Renta", "Netflix"]),
+                "date": start + timedelta(days=i),
+            }
+            for i in range(rows)
+        ])
+        session.commit()
+        return user.id
+
+
+def page_statement(user_id: int):
+    return (
+        select(Transaction)
+        .where(Transaction.user_id == user_id)
+        .order_by(col(Transaction.date).desc(), col(Transaction.id).desc())
+        .limit(50)
+    )
+
+
+def sync_page(user_id: int) -> int:
+    with Session(engine) as session:
+        return len(session.exec(page_statement(user_id)).all())
+
+
+async def async_page(user_id: int) -> int:
+    async with AsyncSession(async_engine) as session:
+        return len((await session.exec(page_statement(user_id))).all())
+
+
+async def run_load(call, clients: int, requests: int) -> dict:
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def client() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "req_per_s": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+async def main_async(args) -> None:
+    SQLModel.metadata.create_all(engine)
+    engine.echo = async_engine.echo = False
+    user_id = seed_user(args.rows)
+
+    modes = {
+        "sync (threadpool)": lambda: anyio.to_thread.run_sync(sync_page, user_id),
+        "async (AsyncSession)": lambda: async_page(user_id),
+    }
+    print(f"{'modo':<22} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, call in modes.items():
+        await run_load(call, args.clients, min(args.requests, 100)) # calentamiento
+        result = await run_load(call, args.clients, args.requests)
+        print(f"{name:<22} {result['req_per_s']:>8} {result['p50_ms']:>8} {result['p95_ms']:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=5000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark en proceso de los caminos calientes a varios tamaños de historial.
+
+Por cada tamaño de `--sizes` genera un usuario sintético (benchmarks/synthetic.py)
+y cronometra los handlers llamándolos directo con una AsyncSession, sin HTTP:
+
+    scan_recurring (full)    re-escaneo completo del historial
+    scan_recurring (incr.)   escaneo incremental tras un alta nueva
+    create_transaction       alta individual
+    read_transactions        primera página del historial
+    check_budget_status      alertas de presupuesto
+    reset_budget_month       cierre de mes (se borra el PeriodClose antes de cada ronda)
+    apply_monthly_interests  intereses del mes (ídem)
+
+Las estadísticas siguen el formato de pytest-benchmark (min, max, media,
+desviación, mediana, rondas) y el resultado incluye la pendiente log-log
+entre tamaños: ~0 = constante, ~1 = lineal en el historial.
+
+Ejecutar desde backend/ (usa DATABASE_URL):
+
+    python -m benchmarks.bench_hot_paths --sizes 1000,10000,100000 --rounds 10 --out bench.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import delete
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.analysis import scan_recurring_expenses
+from app.api.budget import check_budget_status, reset_budget_month
+from app.api.debts import apply_monthly_interests
+from app.api.transactions import TransactionFilters, create_transaction, read_transactions
+from app.db.session import async_engine, engine
+from app.models.base import PeriodClose, User
+from app.schemas.transaction import TransactionCreate
+from benchmarks.synthetic import seed_user
+
+
+def stats(samples: List[float]) -> dict:
+    ordered = sorted(samples)
+    mean = statistics.fmean(ordered)
+    return {
+        "rounds": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "mean_ms": round(mean * 1000, 3),
+        "stddev_ms": round(statistics.stdev(ordered) * 1000, 3) if len(ordered) > 1 else 0.0,
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "ops": round(1 / mean, 2) if mean else None,
+    }
+
+
+def benchmarks(user: User) -> Dict[str, tuple]:
+    """Nombre -> (preparación opcional, llamada cronometrada). Cada llamada abre su sesión."""
+
+    def with_session(handler: Callable[[AsyncSession], Awaitable]):
+        async def call():
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                return await handler(session)
+        return call
+
+    async def clear_period(kind: str):
+        async with AsyncSession(async_engine) as session:
+            await session.exec(delete(PeriodClose).where(PeriodClose.user_id == user.id).where(PeriodClose.kind == kind))
+            await session.commit()
+
+    def new_transaction() -> TransactionCreate:
+        return TransactionCreate(amount=99.0, type="expense", category="Comida", description="Oxxo", date=datetime.utcnow())
+
+    async def add_one():
+        await with_session(lambda s: create_transaction(new_transaction(), session=s, current_user=user))()
+
+    return {
+        "scan_recurring (full)": (None,
+            lambda: scan_recurring_expenses(full=True, background=False, current_user=user)),
+        "scan_recurring (incr.)": (add_one,
+            lambda: scan_recurring_expenses(full=False, background=False, current_user=user)),
+        "create_transaction": (None, with_session(
+            lambda s: create_transaction(new_transaction(), session=s, current_user=user))),
+        "read_transactions": (None, with_session(
+            lambda s: read_transactions(Request({"type": "http", "headers": []}), Response(), TransactionFilters(),
+                                        cursor=None, limit=50, include_all=False, session=s, current_user=user))),
+        "check_budget_status": (None, with_session(
+            lambda s: check_budget_status(session=s, current_user=user))),
+        "reset_budget_month": (lambda: clear_period("budget"), with_session(
+            lambda s: reset_budget_month(session=s, current_user=user))),
+        "apply_monthly_interests": (lambda: clear_period("interest"), with_session(
+            lambda s: apply_monthly_interests(session=s, current_user=user))),
+    }
+
+
+async def run_size(user: User, rounds: int, warmup: int, only: Optional[List[str]]) -> Dict[str, dict]:
+    results = {}
+    for name, (setup, call) in benchmarks(user).items():
+        if only and name not in only:
+            continue
+        samples = []
+        for index in range(warmup + rounds):
+            if setup:
+                await setup()
+            started = time.perf_counter()
+            await call()
+            if index >= warmup:
+                samples.append(time.perf_counter() - started)
+        results[name] = stats(samples)
+    return results
+
+
+def scaling(sizes: List[int], by_size: Dict[int, Dict[str, dict]]) -> Dict[str, Optional[float]]:
+    """Pendiente log-log de la mediana entre el tamaño menor y el mayor."""
+    if len(sizes) < 2:
+        return {}
+    low, high = sizes[0], sizes[-1]
+    slopes = {}
+    for name in by_size[low]:
+        a, b = by_size[low][name]["median_ms"], by_size[high][name]["median_ms"]
+        slopes[name] = round(math.log(b / a) / math.log(high / low), 2) if a and b else None
+    return slopes
+
+
+def print_table(sizes: List[int], by_size: Dict[int, Dict[str, dict]], slopes: Dict[str, Optional[float]]) -> None:
+    header = f"{'benchmark':<26}" + "".join(f"{f'{size:,} filas':>16}" for size in sizes) + f"{'pendiente':>11}"
+    print("\n📈 Mediana (ms) por tamaño de historial")
+    print(header)
+    print("-" * len(header))
+    for name in by_size[sizes[0]]:
+        cells = "".join(f"{by_size[size][name]['median_ms']:>16}" for size in sizes)
+        print(f"{name:<26}{cells}{str(slopes.get(name, '-')):>11}")
+
+
+async def main_async(args) -> dict:
+    SQLModel.metadata.create_all(engine)
+    engine.echo = async_engine.echo = False
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    only = args.only.split(",") if args.only else None
+
+    by_size = {}
+    for size in sizes:
+        started = time.perf_counter()
+        with Session(engine) as session:
+            user_id = seed_user(session, size, args.months, seed=size)
+            user = session.get(User, user_id)
+            session.expunge(user)
+        print(f"🧪 {size:,} filas (usuario {user_id}, generado en {time.perf_counter() - started:.1f}s)")
+        by_size[size] = await run_size(user, args.rounds, args.warmup, only)
+
+    slopes = scaling(sizes, by_size)
+    print_table(sizes, by_size, slopes)
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "database": str(engine.url.get_backend_name()),
+        "config": {"sizes": sizes, "rounds": args.rounds, "warmup": args.warmup, "months": args.months},
+        "results": {str(size): results for size, results in by_size.items()},
+        "scaling": slopes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Movimientos por usuario, separados por coma")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--only", default=None, help="Benchmarks a correr, separados por coma")
+    parser.add_argument("--out", default=None, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.out:
+        with open(args.out, "w") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados en {args.out}")
+
+
+if __name__ == "__main__":
+    main()
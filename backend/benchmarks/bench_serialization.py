@@ -0,0 +1,80 @@
+"""
+Serialización de listas: camino normal (ORM + response_model + JSON de la
+stdlib) vs. camino rápido (columnas como tuplas + orjson, app/core/fast_json.py).
+
+Genera un usuario sintético con `--rows` movimientos y pide en proceso (ASGI,
+sin red) el historial completo, una página de 500 y la lista de deudas, con
+FAST_JSON_LISTS apagado y prendido, sin y con gzip.
+
+Ejecutar desde backend/ (usa DATABASE_URL):
+
+    python -m benchmarks.bench_serialization --rows 50000 --rounds 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from sqlmodel import Session, SQLModel
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.session import async_engine, engine
+from app.main import app
+from benchmarks.synthetic import seed_user
+
+PATHS = ("/transactions/?all=true", "/transactions/?limit=500", "/debts/")
+MODES = (("normal", False), ("rápido", True))
+
+
+async def measure(client: httpx.AsyncClient, path: str, headers: dict, rounds: int) -> dict:
+    await client.get(path, headers=headers) # calentamiento
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+        # Bytes en el cable (httpx descomprime el cuerpo, el header conserva el tamaño real)
+        "bytes": int(response.headers.get("content-length", len(response.content))),
+    }
+
+
+async def main_async(args) -> None:
+    SQLModel.metadata.create_all(engine)
+    engine.echo = async_engine.echo = False
+    with Session(engine) as session:
+        user_id = seed_user(session, args.rows)
+    token = create_access_token(user_id)
+
+    transport = httpx.ASGITransport(app=app)
+    print(f"{'ruta':<28} {'modo':<8} {'gzip':<5} {'mediana ms':>11} {'mín ms':>8} {'bytes':>10} {'speedup':>8}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in PATHS:
+            for gzip in (False, True):
+                headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip" if gzip else "identity"}
+                baseline = None
+                for label, fast in MODES:
+                    settings.FAST_JSON_LISTS = fast
+                    result = await measure(client, path, headers, args.rounds)
+                    baseline = baseline or result["median_ms"]
+                    speedup = baseline / result["median_ms"] if result["median_ms"] else 0.0
+                    print(
+                        f"{path:<28} {label:<8} {'sí' if gzip else 'no':<5} {result['median_ms']:>11} "
+                        f"{result['min_ms']:>8} {result['bytes']:>10} {speedup:>7.2f}x"
+                    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
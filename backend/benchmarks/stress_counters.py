@@ -0,0 +1,126 @@
+"""
+Prueba de estrés de los contadores: `--requests` altas concurrentes
+(`--clients` a la vez) contra la MISMA categoría, deuda y meta de ahorro.
+Al final compara lo guardado con lo esperado por las altas que respondieron
+200; cualquier diferencia es una actualización perdida.
+
+Ejecutar desde backend/ (usa DATABASE_URL, crea un usuario de prueba):
+
+    python -m benchmarks.stress_counters --clients 100 --requests 2000
+
+En SQLite las escrituras se serializan y pueden aparecer "database is locked"
+(cuentan como fallidas, no como perdidas); para medir contención real usar Postgres.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import httpx
+from sqlmodel import Session, SQLModel
+
+from app.core.security import create_access_token
+from app.db.session import engine, async_engine
+from app.main import app
+from app.models.base import BudgetCategory, Debt, SavingGoal, User, UserBalance
+
+AMOUNT = 1.25
+
+
+def seed_targets(requests: int) -> dict:
+    with Session(engine) as session:
+        user = User(
+            email=f"stress_{random.randint(0, 10**9)}@bench.local",
+            password_hash="-",
+            full_name="Stress",
+        )
+        session.add(user)
+        session.commit()
+
+        category = BudgetCategory(user_id=user.id, name="Stress", limit_amount=1_000_000)
+        # Saldo inicial mayor que todos los abonos para que no actúe el recorte a 0
+        debt = Debt(
+            user_id=user.id, name="Stress", total_amount=requests * AMOUNT * 2,
+            current_balance=requests * AMOUNT * 2, interest_rate=0, min_payment=0,
+        )
+        goal = SavingGoal(user_id=user.id, name="Stress", target_amount=1_000_000)
+        session.add_all([category, debt, goal])
+        session.commit()
+        return {
+            "user_id": user.id,
+            "category_id": category.id,
+            "debt_id": debt.id,
+            "goal_id": goal.id,
+            "debt_start": debt.current_balance,
+        }
+
+
+async def fire(ids: dict, clients: int, requests: int) -> dict:
+    headers = {"Authorization": f"Bearer {create_access_token(ids['user_id'])}"}
+    payload = {
+        "amount": AMOUNT,
+        "type": "expense",
+        "category": "Stress",
+        "description": "stress",
+        "debt_id": ids["debt_id"],
+        "saving_goal_id": ids["goal_id"],
+    }
+    remaining = iter(range(requests))
+    counts = {"ok": 0, "failed": 0}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://stress") as client:
+        async def worker() -> None:
+            for _ in remaining:
+                try:
+                    response = await client.post("/transactions/", json=payload, headers=headers)
+                    counts["ok" if response.status_code == 200 else "failed"] += 1
+                except Exception:
+                    counts["failed"] += 1
+
+        await asyncio.gather(*(worker() for _ in range(clients)))
+    return counts
+
+
+def check(ids: dict, ok: int) -> list:
+    expected = round(ok * AMOUNT, 2)
+    with Session(engine) as session:
+        category = session.get(BudgetCategory, ids["category_id"])
+        debt = session.get(Debt, ids["debt_id"])
+        goal = session.get(SavingGoal, ids["goal_id"])
+        totals = session.get(UserBalance, ids["user_id"])
+        observed = {
+            "BudgetCategory.spent_amount": (round(category.spent_amount, 2), expected),
+            "Debt.current_balance": (round(debt.current_balance, 2), round(ids["debt_start"] - expected, 2)),
+            "SavingGoal.current_amount": (round(goal.current_amount, 2), expected),
+            "UserBalance.tx_count": (totals.tx_count if totals else 0, ok),
+        }
+    return [(name, stored, wanted) for name, (stored, wanted) in observed.items()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    SQLModel.metadata.create_all(engine)
+    engine.echo = async_engine.echo = False
+    ids = seed_targets(args.requests)
+
+    started = time.perf_counter()
+    counts = asyncio.run(fire(ids, args.clients, args.requests))
+    elapsed = time.perf_counter() - started
+    print(f"🚀 {counts['ok']} altas OK, {counts['failed']} fallidas en {elapsed:.1f}s")
+
+    lost = 0
+    for name, stored, wanted in check(ids, counts["ok"]):
+        mark = "✅" if stored == wanted else "❌"
+        lost += stored != wanted
+        print(f"{mark} {name}: {stored} (esperado {wanted})")
+    return 1 if lost else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
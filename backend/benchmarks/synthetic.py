@@ -0,0 +1,178 @@
+"""
+Generador de historiales sintéticos a gran escala, cargados directo a la DB
+(INSERT por lotes, sin pasar por la API).
+
+Cada usuario recibe:
+- Comercios recurrentes con su cadencia real (renta y streaming mensuales,
+  nómina quincenal, gimnasio semanal, seguro anual) con algo de ruido en
+  el día y el monto.
+- Gastos "de ruido" repartidos en el periodo (Oxxo, Uber, súper, ...).
+- Deudas con abonos mensuales y metas de ahorro con aportes.
+- Categorías de presupuesto con gasto del mes en curso.
+Al final se reconstruyen los acumulados (UserBalance, DailyBalance,
+MonthlyCategoryTotal) para que los endpoints lean datos coherentes.
+
+Ejecutar desde backend/ (usa DATABASE_URL):
+
+    python -m benchmarks.synthetic --users 20 --rows 100000
+    python -m benchmarks.synthetic --users 1 --rows 2000000 --months 60
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel
+
+from app.db.session import engine
+from app.models.base import BudgetCategory, Debt, SavingGoal, Transaction, User
+from app.services.balances import rebuild_balances, rebuild_monthly_totals
+
+INSERT_BATCH = 5_000
+
+# (descripción, categoría, tipo, monto, cadencia en días o "monthly"/"annual", día del mes)
+RECURRING = (
+    ("Renta Depa", "Hogar", "expense", 8500.0, "monthly", 1),
+    ("Netflix", "Entretenimiento", "expense", 219.0, "monthly", 15),
+    ("Spotify", "Entretenimiento", "expense", 129.0, "monthly", 5),
+    ("Telcel", "Servicios", "expense", 399.0, "monthly", 20),
+    ("Nomina Empresa", "Salario", "income", 14500.0, 14, None),
+    ("Gimnasio", "Salud", "expense", 150.0, 7, None),
+    ("Seguro Auto", "Transporte", "expense", 9800.0, "annual", 10),
+)
+NOISE = (
+    ("Oxxo", "Comida", 35, 180),
+    ("Tacos Don Pepe", "Comida", 60, 250),
+    ("Walmart Super", "Comida", 300, 1800),
+    ("Uber", "Transporte", 45, 320),
+    ("Gasolina", "Transporte", 400, 1100),
+    ("Cinepolis", "Entretenimiento", 90, 400),
+    ("Farmacia", "Salud", 80, 600),
+    ("Amazon", "Hogar", 150, 2500),
+)
+BUDGETS = ("Comida", "Transporte", "Entretenimiento", "Hogar", "Salud", "Servicios")
+
+
+def recurring_dates(cadence, day_of_month, start: datetime, end: datetime, rng: random.Random) -> Iterator[datetime]:
+    if isinstance(cadence, int):
+        current = start + timedelta(days=rng.randint(0, cadence - 1))
+        while current <= end:
+            yield current + timedelta(hours=rng.randint(8, 20))
+            current += timedelta(days=cadence)
+        return
+
+    step = 12 if cadence == "annual" else 1
+    year, month = start.year, start.month
+    while True:
+        # Ruido de ±1 día alrededor del día de cobro
+        day = min(day_of_month, 27) + rng.choice((-1, 0, 0, 0, 1))
+        current = datetime(year, month, max(day, 1), rng.randint(8, 20))
+        if current > end:
+            return
+        if current >= start:
+            yield current
+        month += step
+        year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+
+
+def generate_rows(user_id: int, rows: int, months: int, rng: random.Random, debt_ids=(), goal_ids=()) -> List[dict]:
+    """`rows` movimientos del usuario en los últimos `months` meses (recurrentes + ruido)."""
+    end = datetime.utcnow()
+    start = end - timedelta(days=30 * months)
+    values = []
+
+    # 1. Recurrentes (renta, streaming, nómina, ...)
+    for description, category, tx_type, amount, cadence, day in RECURRING:
+        for when in recurring_dates(cadence, day, start, end, rng):
+            values.append({
+                "user_id": user_id, "description": description, "category": category, "type": tx_type,
+                "amount": round(amount * rng.uniform(0.97, 1.03), 2) if tx_type == "income" else amount,
+                "date": when, "debt_id": None, "saving_goal_id": None,
+            })
+
+    # 2. Abonos mensuales a deudas y aportes a metas
+    for target, key, category in ((debt_ids, "debt_id", "Deudas"), (goal_ids, "saving_goal_id", "Ahorro")):
+        for target_id in target:
+            for when in recurring_dates("monthly", rng.randint(1, 28), start, end, rng):
+                values.append({
+                    "user_id": user_id, "description": f"Abono {category}", "category": category,
+                    "type": "expense", "amount": round(rng.uniform(500, 3000), 2), "date": when,
+                    "debt_id": target_id if key == "debt_id" else None,
+                    "saving_goal_id": target_id if key == "saving_goal_id" else None,
+                })
+
+    # 3. Ruido hasta completar `rows`
+    span = int((end - start).total_seconds())
+    for _ in range(max(rows - len(values), 0)):
+        description, category, low, high = rng.choice(NOISE)
+        values.append({
+            "user_id": user_id, "description": description, "category": category, "type": "expense",
+            "amount": round(rng.uniform(low, high), 2), "date": start + timedelta(seconds=rng.randrange(span)),
+            "debt_id": None, "saving_goal_id": None,
+        })
+    return values[:rows] if len(values) > rows else values
+
+
+def seed_user(session: Session, rows: int, months: int = 24, seed: int = 0) -> int:
+    """Crea un usuario con deudas, metas, presupuestos y `rows` movimientos; devuelve su id."""
+    rng = random.Random(seed)
+    user = User(email=f"synthetic_{seed}_{random.randint(0, 10**9)}@bench.local", password_hash="-", full_name="Synthetic")
+    session.add(user)
+    session.commit()
+
+    debts = [
+        Debt(user_id=user.id, name=name, total_amount=total, current_balance=total * rng.uniform(0.3, 0.9),
+             interest_rate=rate, min_payment=minimum)
+        for name, total, rate, minimum in (
+            ("Tarjeta Oro", 45000.0, 42.0, 1500.0),
+            ("Préstamo Auto", 180000.0, 14.5, 4200.0),
+            ("Tarjeta Departamental", 12000.0, 55.0, 600.0),
+        )
+    ]
+    goals = [
+        SavingGoal(user_id=user.id, name=name, target_amount=target, current_amount=target * rng.uniform(0, 0.6))
+        for name, target in (("Fondo de emergencia", 60000.0), ("Viaje", 25000.0))
+    ]
+    budgets = [
+        BudgetCategory(user_id=user.id, name=name, limit_amount=rng.choice((2000.0, 5000.0, 10000.0)),
+                       spent_amount=round(rng.uniform(0, 9000), 2))
+        for name in BUDGETS
+    ]
+    session.add_all(debts + goals + budgets)
+    session.commit()
+
+    values = generate_rows(user.id, rows, months, rng, [debt.id for debt in debts], [goal.id for goal in goals])
+    for start in range(0, len(values), INSERT_BATCH):
+        session.execute(insert(Transaction), values[start:start + INSERT_BATCH])
+    session.commit()
+
+    # Acumulados coherentes con lo insertado (hacen commit)
+    rebuild_balances(session, user.id)
+    rebuild_monthly_totals(session, user.id)
+    return user.id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=10_000, help="Movimientos por usuario")
+    parser.add_argument("--months", type=int, default=24, help="Meses de historial")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    SQLModel.metadata.create_all(engine)
+    engine.echo = False
+    started = time.perf_counter()
+    with Session(engine) as session:
+        for index in range(args.users):
+            user_id = seed_user(session, args.rows, args.months, args.seed + index)
+            print(f"👤 Usuario {user_id}: {args.rows} movimientos")
+    elapsed = time.perf_counter() - started
+    total = args.users * args.rows
+    print(f"✅ {total} movimientos en {elapsed:.1f}s ({total / elapsed:,.0f} filas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,46 @@ BASE_URL = "http://127.0.0.1:8000"
 EMAIL = f"tester_{random.randint(1000,9999)}@test.com" # Email aleatorio para no chocar
 PASSWORD = "password123"
 
+def build_history(today):
+    """Historial simulado de 3 meses: Netflix y Spotify mensuales + ruido."""
+    # Patrón 1: Netflix (Detectado) - Mismo día, mismo monto
+    dates = [
+        today - timedelta(days=90), # Hace 3 meses
+        today - timedelta(days=60), # Hace 2 meses
+        today - timedelta(days=30)  # Hace 1 mes
+    ]
+
+    rows = []
+    for date_obj in dates:
+        # Transacción Recurrente (Netflix)
+        rows.append({
+            "amount": 15.99,
+            "type": "expense",
+            "category": "Entretenimiento",
+            "description": "Netflix Premium",
+            "date": date_obj.isoformat()
+        })
+
+        # Transacción Recurrente (Spotify)
+        rows.append({
+            "amount": 9.99,
+            "type": "expense",
+            "category": "Entretenimiento",
+            "description": "Spotify Individual",
+            "date": (date_obj + timedelta(days=2)).isoformat() # Unos días después
+        })
+        
+        # Ruido (Gastos random para confundir)
+        for _ in range(2):
+            rows.append({
+                "amount": random.uniform(5, 50),
+                "type": "expense",
+                "category": "Comida",
+                "description": random.choice(["Oxxo", "Uber", "Tacos"]),
+                "date": (date_obj + timedelta(days=random.randint(1, 10))).isoformat()
+            })
+    return rows
+
 async def main():
     async with httpx.AsyncClient() as client:
         print(f"🚀 Iniciando prueba para usuario: {EMAIL}")
@@ -36,42 +76,12 @@ async def main():
         # 3. INYECTAR DATOS SIMULADOS (Pasado)
         print("3️⃣  Inyectando historial de 3 meses...")
         
-        # Patrón 1: Netflix (Detectado) - Mismo día, mismo monto
-        today = datetime.now()
-        dates = [
-            today - timedelta(days=90), # Hace 3 meses
-            today - timedelta(days=60), # Hace 2 meses
-            today - timedelta(days=30)  # Hace 1 mes
-        ]
-
-        for date_obj in dates:
-            # Transacción Recurrente (Netflix)
-            await client.post(f"{BASE_URL}/transactions/", json={
-                "amount": 15.99,
-                "type": "expense",
-                "category": "Entretenimiento",
-                "description": "Netflix Premium",
-                "date": date_obj.isoformat()
-            }, headers=headers)
-
-            # Transacción Recurrente (Spotify)
-            await client.post(f"{BASE_URL}/transactions/", json={
-                "amount": 9.99,
-                "type": "expense",
-                "category": "Entretenimiento",
-                "description": "Spotify Individual",
-                "date": (date_obj + timedelta(days=2)).isoformat() # Unos días después
-            }, headers=headers)
-            
-            # Ruido (Gastos random para confundir)
-            for _ in range(2):
-                await client.post(f"{BASE_URL}/transactions/", json={
-                    "amount": random.uniform(5, 50),
-                    "type": "expense",
-                    "category": "Comida",
-                    "description": random.choice(["Oxxo", "Uber", "Tacos"]),
-                    "date": (date_obj + timedelta(days=random.randint(1, 10))).isoformat()
-                }, headers=headers)
+        # Armamos todo el historial y lo enviamos en UNA sola petición (/bulk)
+        rows = build_history(datetime.now())
+        resp = await client.post(f"{BASE_URL}/transactions/bulk", json=rows, headers=headers)
+        if resp.status_code != 200 or resp.json()["errors"]:
+            print(f"❌ Error en la carga masiva: {resp.text}")
+            return
 
         print("✅ Transacciones insertadas correctamente.")
 
@@ -31,7 +31,8 @@ const Dashboard = () => {
   // --- FUNCIÓN DE CARGA ---
   const fetchData = useCallback(async () => {
     try {
-      const response = await api.get('/transactions/');
+      // all=true: historial completo (el endpoint pagina por defecto)
+      const response = await api.get('/transactions/', { params: { all: true } });
       // Invertimos el array para que el más nuevo salga arriba
       const sortedData = response.data.reverse(); 
       setTransactions(sortedData);